@@ -1,13 +1,32 @@
 import logging
 import os
 
+from ml.thread_config import apply_native_thread_limits, configure_request_threadpool
+
+# Before NumPy / xgboost / SHAP size their native thread pools.
+apply_native_thread_limits()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from ml.drift_monitor import get_drift_monitor
+from ml.global_explain import start_global_explain_job
 from ml.model_loader import load_model
+from ml.shadow import start_shadow_runner
+from ml.similarity import start_similarity_index_in_background
+from ml.warmup import start_warmup_in_background
+from backend.routes.accuracy import router as accuracy_router
+from backend.routes.analytics import router as analytics_router
+from backend.routes.drift import router as drift_router
+from backend.routes.explain import router as explain_router
 from backend.routes.feedback import router as feedback_router
+from backend.routes.health import router as health_router
+from backend.routes.metrics import router as metrics_router
 from backend.routes.model_status import router as model_status_router
 from backend.routes.predict import router as predict_router
+from backend.routes.predictions import router as predictions_router
+from backend.utils.accuracy_tracker import rebuild_from_store
+from backend.utils.prediction_analytics import rebuild_from_logs
 
 logger = logging.getLogger(__name__)
 app = FastAPI()
@@ -32,16 +51,62 @@ app.add_middleware(
 app.include_router(predict_router)
 app.include_router(feedback_router)
 app.include_router(model_status_router)
+app.include_router(drift_router)
+app.include_router(analytics_router)
+app.include_router(accuracy_router)
+app.include_router(predictions_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(explain_router)
 
 
 @app.on_event("startup")
 def startup_load_model():
+    try:
+        configure_request_threadpool()
+    except Exception as e:
+        logger.warning(f"Request threadpool left at default size: {e}")
+
     try:
         load_model()
     except Exception as e:
         # Keep API alive; risk_engine will fallback to baseline.
         logger.error(f"ML startup load failed, baseline mode active: {e}")
 
+    try:
+        get_drift_monitor()
+    except Exception as e:
+        logger.warning(f"Drift monitor disabled: {e}")
+
+    try:
+        rebuild_from_logs()
+    except Exception as e:
+        logger.error(f"Analytics rebuild from logs failed: {e}")
+
+    try:
+        rebuild_from_store()
+    except Exception as e:
+        logger.error(f"Accuracy tracker rebuild failed: {e}")
+
+    try:
+        start_shadow_runner()
+    except Exception as e:
+        logger.error(f"Shadow inference disabled: {e}")
+
+    # Readiness flips once the explainer is built and every path has run.
+    start_warmup_in_background()
+
+    # Cached per model_version; only computed when no cached result exists.
+    try:
+        start_global_explain_job()
+    except Exception as e:
+        logger.error(f"Global explanations disabled: {e}")
+
+    try:
+        start_similarity_index_in_background()
+    except Exception as e:
+        logger.error(f"Similar-project index disabled: {e}")
+
 @app.get("/")
 def root():
     return {"message": "Backend running successfully"}
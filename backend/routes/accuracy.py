@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from backend.utils.accuracy_tracker import get_accuracy_tracker
+
+router = APIRouter()
+
+
+@router.get("/accuracy")
+def accuracy():
+    return get_accuracy_tracker().snapshot()
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from backend.utils.prediction_analytics import get_analytics
+
+router = APIRouter()
+
+
+@router.get("/analytics")
+def analytics():
+    return get_analytics().snapshot()
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from ml.drift_monitor import get_drift_monitor
+
+router = APIRouter()
+
+
+@router.get("/drift")
+def drift():
+    try:
+        report = get_drift_monitor().report()
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+    return {"available": True, **report}
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from ml.global_explain import get_global_explanations, start_global_explain_job
+
+router = APIRouter()
+
+
+@router.get("/explain/global")
+def explain_global(
+    model_version: Optional[str] = None,
+    features: Optional[str] = None,
+    ice: bool = False,
+):
+    """
+    Precomputed global importance and PDP curves. ICE curves are large and
+    only included with ice=true; features is a comma-separated filter on
+    the curves.
+    """
+    try:
+        result, state = get_global_explanations(model_version)
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+    if result is None:
+        return {"available": False, **state}
+
+    curves = result["partial_dependence"]
+    if features:
+        wanted = [name.strip() for name in features.split(",") if name.strip()]
+        unknown = sorted(set(wanted) - set(curves))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown features: {unknown}")
+        curves = {name: curves[name] for name in wanted}
+
+    if not ice:
+        curves = {
+            name: {key: value for key, value in curve.items() if key != "ice"}
+            for name, curve in curves.items()
+        }
+
+    return {"available": True, **state, **result, "partial_dependence": curves}
+
+
+@router.post("/explain/global/refresh")
+def explain_global_refresh():
+    started = start_global_explain_job(refresh=True)
+    return {"started": started, "status": "computing"}
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-import pandas as pd
-import os
+import csv
+import io
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError, field_validator
 from datetime import datetime
 from typing import Optional
 
-router = APIRouter()
+from backend.utils.accuracy_tracker import record_feedback as record_accuracy
+from backend.utils.accuracy_tracker import record_feedback_many as record_accuracy_many
+from backend.utils.feedback_logger import log_feedback, log_feedback_many
+from backend.utils.model_profiles import MODEL_PROFILES
+from backend.utils.prediction_analytics import record_feedback
+from backend.utils.prediction_logger import LOG_PATH
+from backend.utils.prediction_store import get_prediction_store
 
-PREDICTION_FILE = "data/predictions.csv"
-FEEDBACK_FILE = "data/feedback.csv"
+router = APIRouter()
 
 
 class FeedbackInput(BaseModel):
@@ -20,46 +29,155 @@ class FeedbackInput(BaseModel):
     risk_realized: Optional[str] = None
     completion_status: Optional[str] = None
 
+    @field_validator("actual_sdlc_used", mode="before")
+    @classmethod
+    def _known_sdlc(cls, value):
+        # Every label a prediction can carry (ML classes and baseline
+        # profiles), so accuracy never compares against a typo. A blank
+        # cell means "not reported".
+        if isinstance(value, str) and not value.strip():
+            return None
+        if value is not None and value not in MODEL_PROFILES:
+            raise ValueError(f"must be one of {', '.join(MODEL_PROFILES)}")
+        return value
+
+
+def _feedback_row(data: FeedbackInput, timestamp: str) -> dict:
+    return {
+        "project_id": data.project_id,
+        "timestamp": timestamp,
+        "actual_outcome": data.actual_outcome or "",
+        "notes": data.notes or "",
+        "actual_sdlc_used": data.actual_sdlc_used or "",
+        "success_score": data.success_score if data.success_score is not None else "",
+        "risk_realized": data.risk_realized or "",
+        "completion_status": data.completion_status or "",
+    }
+
 
 @router.post("/feedback")
 def submit_feedback(data: FeedbackInput):
 
     # Ensure predictions file exists
-    if not os.path.exists(PREDICTION_FILE):
+    if not LOG_PATH.exists():
         raise HTTPException(status_code=400, detail="No predictions available.")
 
-    df = pd.read_csv(PREDICTION_FILE)
+    # Indexed lookup instead of re-reading the prediction log.
+    if get_prediction_store().get(data.project_id) is None:
+        raise HTTPException(status_code=400, detail="Invalid project_id.")
 
-    if "project_id" not in df.columns:
-        raise HTTPException(status_code=500, detail="Prediction file corrupted.")
+    feedback_row = _feedback_row(data, datetime.utcnow().isoformat())
 
-    if data.project_id not in df["project_id"].astype(str).values:
-        raise HTTPException(status_code=400, detail="Invalid project_id.")
+    # Append feedback without rewriting the existing file
+    log_feedback(feedback_row)
+    record_feedback(feedback_row)
+    record_accuracy(data.project_id, data.actual_sdlc_used)
 
-    # Ensure data folder exists
-    os.makedirs("data", exist_ok=True)
+    return {"message": "Feedback recorded successfully."}
+
+
+# =========================
+# BULK INGESTION
+# =========================
+
+MAX_BULK_BYTES = 64 * 1024 * 1024
 
-    feedback_row = {
-        "project_id": data.project_id,
-        "timestamp": datetime.utcnow().isoformat(),
-        "actual_outcome": data.actual_outcome or "",
-        "notes": data.notes or "",
-        "actual_sdlc_used": data.actual_sdlc_used or "",
-        "success_score": data.success_score if data.success_score is not None else "",
-        "risk_realized": data.risk_realized or "",
-        "completion_status": data.completion_status or "",
-    }
 
-    # Append feedback safely
-    if os.path.exists(FEEDBACK_FILE):
-        feedback_df = pd.read_csv(FEEDBACK_FILE)
-        feedback_df = pd.concat(
-            [feedback_df, pd.DataFrame([feedback_row])],
-            ignore_index=True
+def _parse_bulk(body: bytes, content_type: str) -> list:
+    """
+    (raw row or None, parse error or None) per input row.
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bulk feedback must be UTF-8 encoded (invalid byte at position {e.start}); re-export the file as UTF-8.",
         )
-    else:
-        feedback_df = pd.DataFrame([feedback_row])
 
-    feedback_df.to_csv(FEEDBACK_FILE, index=False)
+    if "csv" in content_type:
+        # Spreadsheet exports leave optional cells empty rather than absent.
+        return [
+            ({key: (value if value != "" else None) for key, value in row.items() if key}, None)
+            for row in csv.DictReader(io.StringIO(text))
+        ]
 
-    return {"message": "Feedback recorded successfully."}
+    parsed = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            parsed.append((row, None) if isinstance(row, dict) else (None, "Row is not a JSON object."))
+        except json.JSONDecodeError as e:
+            parsed.append((None, f"Invalid JSON: {e.msg}"))
+    return parsed
+
+
+def _ingest_bulk(body: bytes, content_type: str) -> dict:
+    if not LOG_PATH.exists():
+        raise HTTPException(status_code=400, detail="No predictions available.")
+
+    results = []
+    candidates = []
+    for index, (raw, error) in enumerate(_parse_bulk(body, content_type)):
+        if error is None:
+            try:
+                candidates.append((index, FeedbackInput.model_validate(raw)))
+                results.append(None)
+                continue
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+        results.append({
+            "row": index,
+            "project_id": raw.get("project_id") if raw else None,
+            "status": "rejected",
+            "error": error,
+        })
+
+    # One set-based lookup for every project_id in the batch.
+    known = get_prediction_store().get_many(
+        {data.project_id for _, data in candidates}, columns=["model_version"]
+    )
+
+    timestamp = datetime.utcnow().isoformat()
+    accepted = []
+    for index, data in candidates:
+        if data.project_id in known:
+            accepted.append(data)
+            results[index] = {"row": index, "project_id": data.project_id, "status": "accepted"}
+        else:
+            results[index] = {"row": index, "project_id": data.project_id, "status": "rejected", "error": "Invalid project_id."}
+
+    rows = [_feedback_row(data, timestamp) for data in accepted]
+    if rows:
+        log_feedback_many(rows)
+        for row in rows:
+            record_feedback(row)
+        record_accuracy_many([(data.project_id, data.actual_sdlc_used) for data in accepted])
+
+    return {
+        "received": len(results),
+        "accepted": len(rows),
+        "rejected": len(results) - len(rows),
+        "results": results,
+    }
+
+
+@router.post("/feedback/bulk")
+async def submit_feedback_bulk(request: Request):
+    """
+    CSV (text/csv) or NDJSON (application/x-ndjson) rows of FeedbackInput.
+    Valid rows are appended in one write; the response lists every row.
+    """
+    content_type = request.headers.get("content-type", "").lower()
+    if "csv" not in content_type and "ndjson" not in content_type and "jsonl" not in content_type:
+        raise HTTPException(status_code=415, detail="Use text/csv or application/x-ndjson.")
+
+    body = await request.body()
+    if len(body) > MAX_BULK_BYTES:
+        raise HTTPException(status_code=413, detail="Bulk feedback payload too large.")
+
+    # Plain JSON types only, so skip jsonable_encoder's per-field walk.
+    return JSONResponse(await run_in_threadpool(_ingest_bulk, body, content_type))
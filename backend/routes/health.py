@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ml.warmup import get_warmup_state
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+def healthz():
+    # Liveness only: the process is up and serving the event loop.
+    state = get_warmup_state()
+    return {"status": "alive", "uptime_s": state["uptime_s"]}
+
+
+@router.get("/readyz")
+def readyz():
+    state = get_warmup_state()
+    body = {
+        "ready": state["ready"],
+        "mode": state["mode"],
+        "model_version": state["model_version"],
+        "warmup_timings_ms": state["timings_ms"],
+        "warmup_errors": state["errors"],
+        "uptime_s": state["uptime_s"],
+    }
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=body)
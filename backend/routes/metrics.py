@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from ml.admission import get_admission_controller
+from ml.predictor import get_coalescing_stats
+from ml.shadow import get_shadow_metrics
+from ml.thread_config import get_thread_config
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def metrics():
+    return {
+        "shadow": get_shadow_metrics(),
+        "coalescing": get_coalescing_stats(),
+        "admission": get_admission_controller().stats(),
+        "threads": get_thread_config(),
+    }
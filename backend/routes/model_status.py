@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from ml.model_loader import load_model
+from ml.model_loader import get_model_format, load_model
 
 router = APIRouter()
 
@@ -17,5 +17,6 @@ def model_status():
     return {
         "ml_model_loaded": ml_model_loaded,
         "mode": "ML_PRIMARY_WITH_FALLBACK",
+        "model_format": get_model_format(),
         "error": error
     }
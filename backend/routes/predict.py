@@ -1,12 +1,92 @@
-from fastapi import APIRouter
+import time
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+
 from backend.schemas.project_schema import ProjectInput
 from backend.services.risk_engine import run_risk_engine
+from ml.admission import LEVEL_BASELINE, LEVEL_FULL, OverloadedError, get_admission_controller
+from ml.counterfactual import search_counterfactuals
+from ml.similarity import MAX_SIMILAR
+from ml.uncertainty import DEFAULT_SAMPLES
 
 router = APIRouter()
 
 
+class CounterfactualInput(BaseModel):
+    project: ProjectInput
+    target: str
+    max_results: int = Field(3, ge=1, le=10)
+    beam_width: int = Field(64, ge=1, le=1024)
+    max_changes: int = Field(8, ge=1, le=24)
+    time_budget_ms: int = Field(500, ge=10, le=5000)
+    locked_fields: List[str] = []
+
+
+def _overloaded(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Prediction service overloaded, retry later.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _admission_dependency(max_level: int, sample_latency: bool = True):
+    """
+    Dependency that admits on the event loop, before the sync handler
+    queues for a worker thread, so queued requests count as in flight and
+    latency is measured from arrival. Yields the degradation level and
+    rejects with 503 above max_level; released when the request finishes.
+    """
+    async def admit():
+        admission = get_admission_controller()
+        arrived = time.monotonic()
+        try:
+            level = admission.admit()
+        except OverloadedError as e:
+            raise _overloaded(e.retry_after)
+
+        try:
+            if level > max_level:
+                raise _overloaded(admission.retry_after)
+            yield level
+        finally:
+            admission.release(time.monotonic() - arrived if sample_latency else None)
+
+    return admit
+
+
+admitted_level = _admission_dependency(LEVEL_BASELINE)
+# Counterfactual search holds a slot but is refused as soon as predictions
+# degrade at all; its multi-second runs are kept out of the latency SLO.
+admitted_full_level = _admission_dependency(LEVEL_FULL, sample_latency=False)
+
+
 @router.post("/predict")
-def predict(project: ProjectInput):
+def predict(
+    project: ProjectInput,
+    uncertainty: bool = False,
+    uncertainty_samples: int = Query(DEFAULT_SAMPLES, ge=100, le=20000),
+    similar: int = Query(0, ge=0, le=MAX_SIMILAR, description="Attach this many similar past projects."),
+    level: int = Depends(admitted_level),
+):
 
     # Logging and project_id assignment are handled by run_risk_engine.
-    return run_risk_engine(project)
+    return run_risk_engine(project, uncertainty_samples if uncertainty else None, similar, level)
+
+
+@router.post("/predict/counterfactual")
+def predict_counterfactual(data: CounterfactualInput, level: int = Depends(admitted_full_level)):
+    try:
+        return search_counterfactuals(
+            data.project,
+            data.target,
+            max_results=data.max_results,
+            beam_width=data.beam_width,
+            max_changes=data.max_changes,
+            time_budget_ms=data.time_budget_ms,
+            locked_fields=data.locked_fields,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -0,0 +1,111 @@
+import base64
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.ml.feature_config import FEATURE_ORDER
+from backend.utils.prediction_store import QUERYABLE_COLUMNS, get_prediction_store
+from ml.similarity import DEFAULT_K, MAX_SIMILAR, find_similar
+
+router = APIRouter()
+
+DEFAULT_COLUMNS = [
+    "project_id",
+    "timestamp",
+    "recommended",
+    "confidence",
+    "model_version",
+    "inference_time",
+]
+MAX_PAGE_SIZE = 500
+
+
+def _encode_cursor(row: dict) -> str:
+    raw = f"{row['timestamp']}|{row['project_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return timestamp, project_id
+
+
+def _parse_timestamp(value: str, name: str) -> str:
+    """
+    ISO date or timestamp in the stored form (naive UTC isoformat), so the
+    string comparison in the store orders it correctly. Offsets are
+    converted to UTC.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected an ISO date or timestamp.")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+@router.get("/predictions")
+def list_predictions(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    recommended: Optional[str] = None,
+    model_version: Optional[str] = None,
+    start: Optional[str] = Query(None, description="Inclusive ISO timestamp or date."),
+    end: Optional[str] = Query(None, description="Exclusive ISO timestamp or date."),
+    columns: Optional[str] = Query(None, description="Comma-separated column names."),
+):
+    if columns:
+        requested = [name.strip() for name in columns.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in QUERYABLE_COLUMNS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {unknown}")
+    else:
+        requested = DEFAULT_COLUMNS
+
+    # The keyset columns are always fetched so the next cursor can be built.
+    selected = ["timestamp", "project_id"] + [
+        name for name in requested if name not in ("timestamp", "project_id")
+    ]
+
+    rows = get_prediction_store().page(
+        selected,
+        limit + 1,
+        after=_decode_cursor(cursor) if cursor else None,
+        recommended=recommended,
+        model_version=model_version,
+        start=_parse_timestamp(start, "start") if start else None,
+        end=_parse_timestamp(end, "end") if end else None,
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1]) if has_more else None
+
+    return {
+        "items": [{name: row[name] for name in requested} for row in rows],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+@router.get("/predictions/{project_id}/similar")
+def similar_predictions(
+    project_id: str,
+    k: int = Query(DEFAULT_K, ge=1, le=MAX_SIMILAR),
+):
+    features = get_prediction_store().get_many([project_id], FEATURE_ORDER).get(project_id)
+    if features is None:
+        raise HTTPException(status_code=404, detail="Unknown project_id.")
+    if any(features[name] is None for name in FEATURE_ORDER):
+        raise HTTPException(status_code=409, detail="Stored prediction has no feature vector.")
+
+    similar = find_similar(features, k, exclude_project_id=project_id)
+    if similar is None:
+        raise HTTPException(status_code=503, detail="Similar-project index is still building.", headers={"Retry-After": "5"})
+
+    return {"project_id": project_id, "similar_projects": similar}
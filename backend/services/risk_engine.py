@@ -7,5 +7,5 @@ All prediction orchestration lives in ml.predictor.run_prediction.
 from ml.predictor import run_prediction
 
 
-def run_risk_engine(project):
-    return run_prediction(project)
+def run_risk_engine(project, uncertainty_samples: int = None, similar: int = None, level: int = None):
+    return run_prediction(project, uncertainty_samples, similar, level)
@@ -0,0 +1,205 @@
+"""
+Online recommendation-accuracy tracking.
+
+Feedback carrying actual_sdlc_used is matched to its logged prediction via
+the indexed prediction store and folded into per-model_version counters:
+top-1/top-2 hits per confidence band, a confusion matrix and calibration
+bins. Each feedback event costs one primary-key lookup and a few counter
+updates; repeated feedback for a project replaces its earlier outcome.
+"""
+
+import threading
+
+from backend.utils.prediction_store import get_prediction_store
+
+CALIBRATION_BIN_COUNT = 10
+
+# Stored prediction columns the counters read.
+PREDICTION_COLUMNS = ["model_version", "recommended", "runner_up", "confidence", "actual_sdlc_used"]
+
+# Upper bounds (exclusive) for the reported confidence bands.
+CONFIDENCE_BANDS = (
+    ("low", 0.4),
+    ("medium", 0.7),
+    ("high", float("inf")),
+)
+
+
+def confidence_band(confidence: float) -> str:
+    for band, upper in CONFIDENCE_BANDS:
+        if confidence < upper:
+            return band
+    return CONFIDENCE_BANDS[-1][0]
+
+
+def _new_slice() -> dict:
+    return {"count": 0, "top1": 0, "top2": 0}
+
+
+class _VersionStats:
+
+    def __init__(self):
+        self.overall = _new_slice()
+        self.bands = {band: _new_slice() for band, _ in CONFIDENCE_BANDS}
+        self.confusion = {}
+        self.calibration = [
+            {"count": 0, "confidence_sum": 0.0, "hits": 0}
+            for _ in range(CALIBRATION_BIN_COUNT)
+        ]
+
+    def apply(self, prediction: dict, actual: str, sign: int):
+        confidence = float(prediction["confidence"])
+        top1 = prediction["recommended"] == actual
+        top2 = top1 or prediction.get("runner_up") == actual
+
+        for counts in (self.overall, self.bands[confidence_band(confidence)]):
+            counts["count"] += sign
+            counts["top1"] += sign * top1
+            counts["top2"] += sign * top2
+
+        row = self.confusion.setdefault(prediction["recommended"], {})
+        row[actual] = row.get(actual, 0) + sign
+
+        calibration_bin = self.calibration[
+            min(max(int(confidence * CALIBRATION_BIN_COUNT), 0), CALIBRATION_BIN_COUNT - 1)
+        ]
+        calibration_bin["count"] += sign
+        calibration_bin["confidence_sum"] += sign * confidence
+        calibration_bin["hits"] += sign * top1
+
+    def snapshot(self) -> dict:
+        def rates(counts: dict) -> dict:
+            n = counts["count"]
+            return {
+                "count": n,
+                "top1_accuracy": round(counts["top1"] / n, 4) if n else None,
+                "top2_accuracy": round(counts["top2"] / n, 4) if n else None,
+            }
+
+        total = self.overall["count"]
+        width = 1 / CALIBRATION_BIN_COUNT
+        calibration = []
+        expected_calibration_error = 0.0
+
+        for i, b in enumerate(self.calibration):
+            mean_confidence = b["confidence_sum"] / b["count"] if b["count"] else None
+            accuracy = b["hits"] / b["count"] if b["count"] else None
+            if b["count"]:
+                expected_calibration_error += b["count"] / total * abs(accuracy - mean_confidence)
+
+            calibration.append({
+                "lower": round(i * width, 2),
+                "upper": round((i + 1) * width, 2),
+                "count": b["count"],
+                "mean_confidence": round(mean_confidence, 4) if mean_confidence is not None else None,
+                "accuracy": round(accuracy, 4) if accuracy is not None else None,
+            })
+
+        return {
+            **rates(self.overall),
+            "by_confidence_band": {band: rates(counts) for band, counts in self.bands.items()},
+            "confusion_matrix": {
+                predicted: {actual: n for actual, n in row.items() if n}
+                for predicted, row in self.confusion.items()
+            },
+            "calibration": calibration,
+            "expected_calibration_error": round(expected_calibration_error, 4) if total else None,
+        }
+
+
+class AccuracyTracker:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def _apply(self, prediction: dict, actual: str, sign: int):
+        stats = self._versions.get(prediction["model_version"])
+        if stats is None:
+            stats = self._versions[prediction["model_version"]] = _VersionStats()
+        stats.apply(prediction, actual, sign)
+
+    def record_feedback(self, project_id: str, actual: str) -> bool:
+        """
+        Join one outcome to its stored prediction and count it. An outcome
+        already recorded for the project is retracted first.
+        """
+        store = get_prediction_store()
+
+        with self._lock:
+            prediction = store.get(project_id)
+            if prediction is None:
+                return False
+
+            previous = prediction.get("actual_sdlc_used")
+            if previous:
+                self._apply(prediction, previous, -1)
+            self._apply(prediction, actual, 1)
+            store.set_actual_sdlc(project_id, actual)
+
+        return True
+
+    def record_feedback_many(self, outcomes: list) -> int:
+        """
+        Batch form of record_feedback for (project_id, actual) pairs: one
+        store lookup and one store update for the whole batch. Later rows
+        for the same project supersede earlier ones, as sequential calls
+        would.
+        """
+        store = get_prediction_store()
+        outcomes = [(project_id, actual) for project_id, actual in outcomes if actual]
+
+        with self._lock:
+            predictions = store.get_many({project_id for project_id, _ in outcomes}, PREDICTION_COLUMNS)
+            current = {project_id: row.get("actual_sdlc_used") for project_id, row in predictions.items()}
+
+            applied = 0
+            for project_id, actual in outcomes:
+                prediction = predictions.get(project_id)
+                if prediction is None:
+                    continue
+                if current[project_id]:
+                    self._apply(prediction, current[project_id], -1)
+                self._apply(prediction, actual, 1)
+                current[project_id] = actual
+                applied += 1
+
+            # Every fetched project appears in outcomes, so current holds its final value.
+            store.set_actual_sdlc_many(current.items())
+
+        return applied
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "by_model_version": {
+                    version: stats.snapshot() for version, stats in self._versions.items()
+                },
+            }
+
+
+_tracker = AccuracyTracker()
+
+
+def get_accuracy_tracker() -> AccuracyTracker:
+    return _tracker
+
+
+def record_feedback(project_id: str, actual_sdlc_used: str):
+    if actual_sdlc_used:
+        _tracker.record_feedback(project_id, actual_sdlc_used)
+
+
+def record_feedback_many(outcomes: list) -> int:
+    return _tracker.record_feedback_many(outcomes)
+
+
+def rebuild_from_store() -> AccuracyTracker:
+    global _tracker
+
+    tracker = AccuracyTracker()
+    for prediction in get_prediction_store().rows_with_feedback():
+        tracker._apply(prediction, prediction["actual_sdlc_used"], 1)
+
+    _tracker = tracker
+    return tracker
@@ -0,0 +1,55 @@
+import csv
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+FEEDBACK_LOG_PATH = BASE_DIR / "data" / "feedback.csv"
+
+FEEDBACK_FIELDS = [
+    "project_id",
+    "timestamp",
+    "actual_outcome",
+    "notes",
+    "actual_sdlc_used",
+    "success_score",
+    "risk_realized",
+    "completion_status",
+]
+
+_feedback_lock = threading.Lock()
+
+
+def log_feedback(row: dict):
+
+    with _feedback_lock:
+        file_exists = FEEDBACK_LOG_PATH.exists()
+        FEEDBACK_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(FEEDBACK_LOG_PATH, mode="a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FEEDBACK_FIELDS)
+
+            if not file_exists:
+                writer.writeheader()
+
+            writer.writerow(row)
+
+    return row
+
+
+def log_feedback_many(rows: list):
+    """
+    Append a batch of feedback rows in a single write.
+    """
+    with _feedback_lock:
+        file_exists = FEEDBACK_LOG_PATH.exists()
+        FEEDBACK_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(FEEDBACK_LOG_PATH, mode="a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FEEDBACK_FIELDS)
+
+            if not file_exists:
+                writer.writeheader()
+
+            writer.writerows(rows)
+
+    return rows
@@ -0,0 +1,263 @@
+"""
+Incrementally maintained prediction analytics.
+
+Every prediction and feedback write is folded into bounded aggregates
+(class counts, confidence histogram, P² latency quantiles, fallback rate,
+hourly/daily volumes), so /analytics answers in constant time however long
+the logs grow. The aggregates can be rebuilt by replaying the CSV logs.
+"""
+
+import csv
+import threading
+
+from backend.utils.feedback_logger import FEEDBACK_LOG_PATH
+from backend.utils.prediction_logger import LOG_PATH
+
+CONFIDENCE_BIN_COUNT = 10
+LATENCY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+MAX_HOURLY_BUCKETS = 48
+MAX_DAILY_BUCKETS = 30
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimator (Jain & Chlamtac P² algorithm).
+
+    Keeps five markers regardless of how many observations are added.
+    """
+
+    def __init__(self, p: float):
+        self.p = p
+        self._initial = []
+        self._heights = None
+        self._positions = None
+        self._desired = None
+        self._increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x: float):
+        if self._heights is None:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                self._heights = sorted(self._initial)
+                self._positions = [0, 1, 2, 3, 4]
+                p = self.p
+                self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+            return
+
+        q, n = self._heights, self._positions
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if self._heights is None:
+            if not self._initial:
+                return None
+            ordered = sorted(self._initial)
+            return ordered[round(self.p * (len(ordered) - 1))]
+        return self._heights[2]
+
+
+class _BucketCounter:
+    """
+    Counts keyed by time bucket, keeping only the newest max_buckets keys.
+    """
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self.counts = {}
+
+    def add(self, key: str):
+        if key in self.counts:
+            self.counts[key] += 1
+            return
+
+        self.counts[key] = 1
+        if len(self.counts) > self.max_buckets:
+            del self.counts[min(self.counts)]
+
+    def snapshot(self) -> dict:
+        return dict(sorted(self.counts.items()))
+
+
+def _is_baseline(model_version: str) -> bool:
+    return str(model_version).startswith("baseline")
+
+
+class PredictionAnalytics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.prediction_count = 0
+        self.fallback_count = 0
+        self.recommended_counts = {}
+        self.model_version_counts = {}
+
+        self.confidence_bins = [0] * CONFIDENCE_BIN_COUNT
+        self.confidence_sum = 0.0
+
+        self.latency_quantiles = {p: P2Quantile(p) for p in LATENCY_QUANTILES}
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+        self.hourly_predictions = _BucketCounter(MAX_HOURLY_BUCKETS)
+        self.daily_predictions = _BucketCounter(MAX_DAILY_BUCKETS)
+
+        self.feedback_count = 0
+        self.feedback_sdlc_counts = {}
+        self.daily_feedback = _BucketCounter(MAX_DAILY_BUCKETS)
+
+    def record_prediction(self, row: dict):
+        """
+        Fold one prediction log row in. Values may be typed or CSV strings.
+        """
+        timestamp = str(row["timestamp"])
+        recommended = str(row["recommended"])
+        model_version = str(row["model_version"])
+        confidence = float(row["confidence"])
+        latency_ms = float(row["inference_time"]) * 1000
+
+        confidence_bin = min(max(int(confidence * CONFIDENCE_BIN_COUNT), 0), CONFIDENCE_BIN_COUNT - 1)
+
+        with self._lock:
+            self.prediction_count += 1
+            if _is_baseline(model_version):
+                self.fallback_count += 1
+
+            self.recommended_counts[recommended] = self.recommended_counts.get(recommended, 0) + 1
+            self.model_version_counts[model_version] = self.model_version_counts.get(model_version, 0) + 1
+
+            self.confidence_bins[confidence_bin] += 1
+            self.confidence_sum += confidence
+
+            for estimator in self.latency_quantiles.values():
+                estimator.add(latency_ms)
+            self.latency_sum += latency_ms
+            self.latency_max = max(self.latency_max, latency_ms)
+
+            self.hourly_predictions.add(timestamp[:13])
+            self.daily_predictions.add(timestamp[:10])
+
+    def record_feedback(self, row: dict):
+        timestamp = str(row["timestamp"])
+        actual_sdlc = str(row.get("actual_sdlc_used") or "") or "unreported"
+
+        with self._lock:
+            self.feedback_count += 1
+            self.feedback_sdlc_counts[actual_sdlc] = self.feedback_sdlc_counts.get(actual_sdlc, 0) + 1
+            self.daily_feedback.add(timestamp[:10])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = self.prediction_count
+            width = 1 / CONFIDENCE_BIN_COUNT
+
+            return {
+                "predictions": {
+                    "total": count,
+                    "by_recommended": dict(self.recommended_counts),
+                    "by_model_version": dict(self.model_version_counts),
+                    "ml_count": count - self.fallback_count,
+                    "baseline_fallback_count": self.fallback_count,
+                    "baseline_fallback_rate": round(self.fallback_count / count, 4) if count else None,
+                },
+                "confidence": {
+                    "mean": round(self.confidence_sum / count, 4) if count else None,
+                    "histogram": [
+                        {
+                            "lower": round(i * width, 2),
+                            "upper": round((i + 1) * width, 2),
+                            "count": self.confidence_bins[i],
+                        }
+                        for i in range(CONFIDENCE_BIN_COUNT)
+                    ],
+                },
+                "latency_ms": {
+                    "mean": round(self.latency_sum / count, 2) if count else None,
+                    "max": round(self.latency_max, 2) if count else None,
+                    **{
+                        f"p{int(p * 100)}": (
+                            round(estimator.value(), 2) if estimator.value() is not None else None
+                        )
+                        for p, estimator in self.latency_quantiles.items()
+                    },
+                },
+                "volume": {
+                    "hourly": self.hourly_predictions.snapshot(),
+                    "daily": self.daily_predictions.snapshot(),
+                },
+                "feedback": {
+                    "total": self.feedback_count,
+                    "by_actual_sdlc": dict(self.feedback_sdlc_counts),
+                    "daily": self.daily_feedback.snapshot(),
+                },
+            }
+
+
+_analytics = PredictionAnalytics()
+
+
+def get_analytics() -> PredictionAnalytics:
+    return _analytics
+
+
+def record_prediction(row: dict):
+    _analytics.record_prediction(row)
+
+
+def record_feedback(row: dict):
+    _analytics.record_feedback(row)
+
+
+def rebuild_from_logs() -> PredictionAnalytics:
+    """
+    Replay the prediction and feedback logs into fresh aggregates and swap
+    them in. Rows are streamed, so memory stays bounded.
+    """
+    global _analytics
+
+    analytics = PredictionAnalytics()
+
+    if LOG_PATH.exists():
+        with open(LOG_PATH, newline="") as file:
+            for row in csv.DictReader(file):
+                analytics.record_prediction(row)
+
+    if FEEDBACK_LOG_PATH.exists():
+        with open(FEEDBACK_LOG_PATH, newline="") as file:
+            for row in csv.DictReader(file):
+                analytics.record_feedback(row)
+
+    _analytics = analytics
+    return analytics
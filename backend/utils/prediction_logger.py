@@ -1,15 +1,88 @@
 import csv
-import os
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from backend.ml.feature_config import FEATURE_ORDER
+from backend.utils.model_profiles import MODEL_PROFILES
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 LOG_PATH = BASE_DIR / "data" / "predictions.csv"
+SHADOW_LOG_PATH = BASE_DIR / "data" / "shadow_predictions.csv"
 
+# Fixed columns so ML rows (5 classes) and baseline rows (every profile)
+# line up under one header.
+PREDICTION_FIELDS = [
+    "project_id",
+    "timestamp",
+    *FEATURE_ORDER,
+    "recommended",
+    "confidence",
+    "model_version",
+    "inference_time",
+    *[f"prob_{label}" for label in MODEL_PROFILES],
+]
 
-def log_prediction(project_id: str, features: dict, result: dict):
+SHADOW_FIELDS = [
+    "project_id",
+    "timestamp",
+    "primary_model_version",
+    "primary_recommended",
+    "primary_inference_time",
+    "primary_model_time",
+    "candidate_model_version",
+    "candidate_fingerprint",
+    "candidate_recommended",
+    "candidate_confidence",
+    "candidate_inference_time",
+    "agreement",
+    "candidate_probabilities",
+]
+
+# Appends from concurrent request threads must not interleave or race on
+# writing the header. One lock per log file, so the shadow worker never
+# holds up request threads appending to the prediction log.
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+_log_fields = {}
+
+
+def _log_lock(path: Path) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(path, threading.Lock())
+
+
+def _fieldnames(path: Path, default: list) -> list:
+    """
+    Header of an existing log (older logs keep their own column set),
+    else default. Cached per path; call with the path's _log_lock held.
+    """
+    if path not in _log_fields:
+        header = None
+        if path.exists():
+            with open(path, newline="") as file:
+                header = next(csv.reader(file), None)
+        _log_fields[path] = header or list(default)
+    return _log_fields[path]
 
-    file_exists = LOG_PATH.exists()
+
+def _append(path: Path, default_fields: list, row: dict):
+    with _log_lock(path):
+        if not path.exists():
+            _log_fields.pop(path, None)
+        fieldnames = _fieldnames(path, default_fields)
+        write_header = not path.exists() or path.stat().st_size == 0
+
+        with open(path, mode="a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval="", extrasaction="ignore")
+
+            if write_header:
+                writer.writeheader()
+
+            writer.writerow(row)
+
+
+def log_prediction(project_id: str, features: dict, result: dict):
 
     row = {
         "project_id": project_id,
@@ -25,10 +98,9 @@ def log_prediction(project_id: str, features: dict, result: dict):
     for model, score in result["risks"].items():
         row[f"prob_{model}"] = score
 
-    with open(LOG_PATH, mode="a", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=row.keys())
+    _append(LOG_PATH, PREDICTION_FIELDS, row)
+    return row
 
-        if not file_exists:
-            writer.writeheader()
 
-        writer.writerow(row)
+def log_shadow_prediction(row: dict):
+    _append(SHADOW_LOG_PATH, SHADOW_FIELDS, row)
@@ -0,0 +1,265 @@
+"""
+Indexed prediction store.
+
+A SQLite sidecar to data/predictions.csv keyed by project_id, so feedback
+can be matched to its prediction with a primary-key lookup and history can
+be paged by (timestamp, project_id) keyset without re-reading the CSV. The
+CSV stays the source of truth: a missing or outdated store is rebuilt from
+the prediction and feedback logs.
+"""
+
+import csv
+import sqlite3
+import threading
+
+from backend.ml.feature_config import FEATURE_ORDER
+from backend.utils.feedback_logger import FEEDBACK_LOG_PATH
+from backend.utils.model_profiles import MODEL_PROFILES
+from backend.utils.prediction_logger import BASE_DIR, LOG_PATH
+
+STORE_PATH = BASE_DIR / "data" / "predictions.db"
+
+# Bump when the table layout changes; older stores are rebuilt from the logs.
+SCHEMA_VERSION = 2
+
+CORE_COLUMNS = [
+    "project_id",
+    "timestamp",
+    "model_version",
+    "recommended",
+    "runner_up",
+    "confidence",
+    "inference_time",
+]
+PROBABILITY_COLUMNS = [f"prob_{label}" for label in MODEL_PROFILES]
+STORED_COLUMNS = CORE_COLUMNS + list(FEATURE_ORDER) + PROBABILITY_COLUMNS
+QUERYABLE_COLUMNS = STORED_COLUMNS + ["actual_sdlc_used"]
+
+
+def _column_list(names) -> str:
+    return ", ".join(f'"{name}"' for name in names)
+
+
+_SCHEMA = [
+    f"""
+    CREATE TABLE predictions (
+        project_id TEXT PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        model_version TEXT NOT NULL,
+        recommended TEXT NOT NULL,
+        runner_up TEXT,
+        confidence REAL NOT NULL,
+        inference_time REAL,
+        {", ".join(f'"{name}" REAL' for name in list(FEATURE_ORDER) + PROBABILITY_COLUMNS)},
+        actual_sdlc_used TEXT
+    )
+    """,
+    "CREATE INDEX idx_predictions_time ON predictions (timestamp, project_id)",
+    "CREATE INDEX idx_predictions_recommended_time ON predictions (recommended, timestamp, project_id)",
+    "CREATE INDEX idx_predictions_version_time ON predictions (model_version, timestamp, project_id)",
+]
+
+_INSERT = (
+    f"INSERT OR REPLACE INTO predictions ({_column_list(STORED_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in STORED_COLUMNS)})"
+)
+
+
+def _optional_float(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _runner_up(row: dict):
+    """
+    Second-ranked class from the logged prob_<class> columns.
+    """
+    probs = {
+        key[len("prob_"):]: float(value)
+        for key, value in row.items()
+        if isinstance(key, str) and key.startswith("prob_") and value not in (None, "")
+    }
+    ranking = sorted(probs, key=probs.get, reverse=not str(row["model_version"]).startswith("baseline"))
+    return ranking[1] if len(ranking) > 1 else None
+
+
+class PredictionStore:
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.rebuild()
+
+    def rebuild(self):
+        """
+        Recreate the store by streaming the prediction and feedback logs.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DROP TABLE IF EXISTS predictions")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+            if LOG_PATH.exists():
+                with open(LOG_PATH, newline="") as file:
+                    self._conn.executemany(
+                        _INSERT,
+                        (self._values(row) for row in csv.DictReader(file)),
+                    )
+
+            if FEEDBACK_LOG_PATH.exists():
+                with open(FEEDBACK_LOG_PATH, newline="") as file:
+                    self._conn.executemany(
+                        "UPDATE predictions SET actual_sdlc_used = ? WHERE project_id = ?",
+                        (
+                            (row["actual_sdlc_used"], row["project_id"])
+                            for row in csv.DictReader(file)
+                            if row.get("actual_sdlc_used")
+                        ),
+                    )
+
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _values(row: dict) -> tuple:
+        return (
+            str(row["project_id"]),
+            str(row["timestamp"]),
+            str(row["model_version"]),
+            str(row["recommended"]),
+            _runner_up(row),
+            float(row["confidence"]),
+            _optional_float(row.get("inference_time")),
+            *(_optional_float(row.get(name)) for name in FEATURE_ORDER),
+            *(_optional_float(row.get(name)) for name in PROBABILITY_COLUMNS),
+        )
+
+    def add(self, row: dict):
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT, self._values(row))
+
+    def get(self, project_id: str):
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT * FROM predictions WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return dict(found) if found is not None else None
+
+    def get_many(self, project_ids, columns: list = None) -> dict:
+        """
+        Set-based lookup: project_id -> row for every id that exists, via
+        one join against a temp table instead of a query per id.
+        """
+        if columns:
+            selected = ", ".join(f'p."{name}"' for name in ["project_id", *columns])
+        else:
+            selected = "p.*"
+
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_ids (project_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM lookup_ids")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO lookup_ids VALUES (?)",
+                ((str(project_id),) for project_id in project_ids),
+            )
+            rows = self._conn.execute(
+                f"SELECT {selected} FROM predictions p JOIN lookup_ids USING (project_id)"
+            ).fetchall()
+            self._conn.execute("DELETE FROM lookup_ids")
+        return {row["project_id"]: dict(row) for row in rows}
+
+    def page(
+        self,
+        columns: list,
+        limit: int,
+        after=None,
+        recommended=None,
+        model_version=None,
+        start=None,
+        end=None,
+    ) -> list:
+        """
+        Newest-first page of predictions strictly older than the keyset
+        after=(timestamp, project_id). start is inclusive, end exclusive.
+        """
+        clauses = []
+        params = []
+
+        if recommended is not None:
+            clauses.append("recommended = ?")
+            params.append(recommended)
+        if model_version is not None:
+            clauses.append("model_version = ?")
+            params.append(model_version)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        if after is not None:
+            clauses.append("(timestamp, project_id) < (?, ?)")
+            params.extend(after)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        selected = _column_list(columns)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {selected} FROM predictions {where} "
+                "ORDER BY timestamp DESC, project_id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def set_actual_sdlc(self, project_id: str, actual_sdlc_used: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE predictions SET actual_sdlc_used = ? WHERE project_id = ?",
+                (actual_sdlc_used, project_id),
+            )
+
+    def set_actual_sdlc_many(self, pairs):
+        """
+        (project_id, actual_sdlc_used) updates in one transaction.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE predictions SET actual_sdlc_used = ? WHERE project_id = ?",
+                ((actual, project_id) for project_id, actual in pairs),
+            )
+
+    def rows_with_feedback(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM predictions WHERE actual_sdlc_used IS NOT NULL"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_prediction_store() -> PredictionStore:
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PredictionStore()
+
+    return _store
+
+
+def record_prediction(row: dict):
+    get_prediction_store().add(row)
@@ -0,0 +1,197 @@
+"""
+ADMISSION CONTROL - SLO-driven graceful degradation
+
+Tracks recent end-to-end prediction latency and the number of in-flight
+predictions against a configured SLO and picks a degradation level:
+
+    0  FULL       ML + SHAP explanations
+    1  NO_SHAP    ML, weighted-contribution explanations
+    2  BASELINE   weighted baseline scorer only
+    3  SHED       reject with 503 + Retry-After
+
+Levels move one step at a time: up as soon as load at the current level
+crosses the next threshold, down only after a cooldown, so the controller
+does not flap. Latency samples are reset on every level change (each
+level is judged on its own latency) and expire after a short window,
+which lets a shedding instance recover even though shed requests produce
+no samples.
+
+Requests are admitted on the event loop when they arrive (see
+backend.routes.predict), before the sync handler waits for a threadpool
+worker. Latency therefore includes the queue wait, and queued requests
+count as in flight.
+
+Configuration (environment):
+    SDLC_ADMISSION_CONTROL     "0" disables the controller (always level 0)
+    SDLC_SLO_P95_MS            latency objective for p95, default 250
+    SDLC_MAX_IN_FLIGHT         hard cap on admitted predictions (running plus
+                               queued for a worker thread), default
+                               2 * request_threads from ml.thread_config
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from ml.thread_config import get_thread_config
+
+LEVEL_FULL = 0
+LEVEL_NO_SHAP = 1
+LEVEL_BASELINE = 2
+LEVEL_SHED = 3
+
+LEVEL_NAMES = {
+    LEVEL_FULL: "full",
+    LEVEL_NO_SHAP: "no_shap",
+    LEVEL_BASELINE: "baseline",
+    LEVEL_SHED: "shed",
+}
+
+# Pressure (max of p95 / SLO and in-flight / cap) at which each level starts.
+_LEVEL_THRESHOLDS = (
+    (LEVEL_SHED, 1.25),
+    (LEVEL_BASELINE, 1.0),
+    (LEVEL_NO_SHAP, 0.8),
+)
+
+SAMPLE_WINDOW_S = 5.0
+MAX_SAMPLES = 512
+MIN_SAMPLES = 10
+EVALUATE_EVERY_S = 0.1
+STEP_DOWN_COOLDOWN_S = 2.0
+# Admitted requests allowed per request thread, counting those still queued.
+IN_FLIGHT_PER_THREAD = 2
+
+
+class OverloadedError(RuntimeError):
+
+    def __init__(self, retry_after: int):
+        super().__init__("Prediction service overloaded")
+        self.retry_after = retry_after
+
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    raw = str(os.getenv(name, default)).strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+class AdmissionController:
+
+    def __init__(self, slo_p95_ms: float, max_in_flight: int, enabled: bool = True):
+        self.slo_p95_ms = slo_p95_ms
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=MAX_SAMPLES)
+        self._in_flight = 0
+        self._level = LEVEL_FULL
+        self._level_changed_at = time.monotonic()
+        self._evaluated_at = 0.0
+        self._p95_ms = None
+
+        self.requests = dict.fromkeys(LEVEL_NAMES, 0)
+
+    def _recent_p95(self, now: float):
+        while self._samples and now - self._samples[0][0] > SAMPLE_WINDOW_S:
+            self._samples.popleft()
+        if len(self._samples) < MIN_SAMPLES:
+            return None
+        return float(np.percentile([latency for _, latency in self._samples], 95))
+
+    def _set_level(self, level: int, now: float):
+        self._level = level
+        self._level_changed_at = now
+        self._samples.clear()
+
+    def _evaluate(self, now: float):
+        if now - self._evaluated_at < EVALUATE_EVERY_S:
+            return
+        self._evaluated_at = now
+
+        self._p95_ms = self._recent_p95(now)
+        pressure = max(
+            (self._p95_ms or 0.0) / self.slo_p95_ms,
+            self._in_flight / self.max_in_flight,
+        )
+
+        target = LEVEL_FULL
+        for level, threshold in _LEVEL_THRESHOLDS:
+            if pressure >= threshold:
+                target = level
+                break
+
+        if target > self._level:
+            self._set_level(self._level + 1, now)
+        elif target < self._level and now - self._level_changed_at >= STEP_DOWN_COOLDOWN_S:
+            self._set_level(self._level - 1, now)
+
+    def admit(self) -> int:
+        """
+        Reserve a slot and return the degradation level to serve at.
+        Raises OverloadedError when the request should be shed.
+        """
+        if not self.enabled:
+            return LEVEL_FULL
+
+        now = time.monotonic()
+        with self._lock:
+            self._evaluate(now)
+
+            if self._level == LEVEL_SHED or self._in_flight >= self.max_in_flight:
+                self.requests[LEVEL_SHED] += 1
+                raise OverloadedError(retry_after=self.retry_after)
+
+            self._in_flight += 1
+            self.requests[self._level] += 1
+            return self._level
+
+    @property
+    def retry_after(self) -> int:
+        return math.ceil(STEP_DOWN_COOLDOWN_S)
+
+    def release(self, latency_s: float = None):
+        """
+        Free the slot. latency_s=None frees it without a latency sample, for
+        work that is not a prediction and must not move the SLO signal.
+        """
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            if latency_s is not None:
+                self._samples.append((now, latency_s * 1000))
+            self._evaluate(now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "level": self._level,
+                "level_name": LEVEL_NAMES[self._level],
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "slo_p95_ms": self.slo_p95_ms,
+                "recent_p95_ms": round(self._p95_ms, 2) if self._p95_ms is not None else None,
+                "requests_by_level": {LEVEL_NAMES[level]: n for level, n in self.requests.items()},
+            }
+
+
+_controller = AdmissionController(
+    slo_p95_ms=float(os.getenv("SDLC_SLO_P95_MS", 250)),
+    max_in_flight=int(os.getenv(
+        "SDLC_MAX_IN_FLIGHT",
+        IN_FLIGHT_PER_THREAD * get_thread_config()["request_threads"],
+    )),
+    enabled=_env_flag("SDLC_ADMISSION_CONTROL"),
+)
+
+
+def get_admission_controller() -> AdmissionController:
+    return _controller
@@ -0,0 +1,231 @@
+"""
+COUNTERFACTUAL SEARCH - Smallest slider/dropdown changes that flip the
+recommendation to a target SDLC
+
+Only the discrete inputs are searched (1–5 sliders and 1/3/5 dropdowns);
+budget, duration, team size and integrations stay as entered. Cost is the
+number of steps moved, summed over fields (a dropdown step is one option,
+e.g. 1 → 3).
+
+Beam search by depth: each layer expands every beam state by one step on
+every unlocked field, drops states already seen, and scores the whole
+layer with one batched transform + predict_proba call per chunk. States
+where the target is the top class are kept as solutions and not expanded
+(any extension costs more); the rest are ranked by target margin
+(p_target − best other) and the top beam_width go on. The search stops
+once enough solutions exist, at max_changes, or at the time budget, and
+returns the best found so far.
+"""
+
+import time
+
+import numpy as np
+
+from ml.feature_pipeline import RAW_INPUT_FIELDS
+from ml.model_loader import get_class_labels, get_feature_pipeline, load_model
+
+SLIDER_LEVELS = (1, 2, 3, 4, 5)
+DROPDOWN_LEVELS = (1, 3, 5)
+
+SEARCH_SPACE = {
+    "team_experience_level": SLIDER_LEVELS,
+    "agile_maturity_level": SLIDER_LEVELS,
+    "requirement_clarity": SLIDER_LEVELS,
+    "client_involvement_level": SLIDER_LEVELS,
+    "regulatory_strictness": SLIDER_LEVELS,
+    "system_complexity": SLIDER_LEVELS,
+    "automation_level": SLIDER_LEVELS,
+    "delivery_urgency": SLIDER_LEVELS,
+    "requirement_change_frequency": DROPDOWN_LEVELS,
+    "decision_making_speed": DROPDOWN_LEVELS,
+    "domain_criticality": DROPDOWN_LEVELS,
+    "risk_tolerance_level": DROPDOWN_LEVELS,
+}
+
+SEARCH_FIELDS = list(SEARCH_SPACE)
+
+# Rows per predict_proba call; the deadline is checked between chunks.
+SCORE_CHUNK = 4096
+
+
+class _Scorer:
+    """
+    Level-index states (n, n_fields) to class probabilities in one batch.
+    """
+
+    def __init__(self, project):
+        self.model = load_model()
+        self.pipeline = get_feature_pipeline()
+        self.fixed = {
+            name: float(getattr(project, name))
+            for name in RAW_INPUT_FIELDS if name not in SEARCH_SPACE
+        }
+        self.levels = [np.asarray(SEARCH_SPACE[name], dtype=np.float64) for name in SEARCH_FIELDS]
+        self.evaluated = 0
+
+    def __call__(self, states: np.ndarray) -> np.ndarray:
+        n = len(states)
+        columns = {name: np.full(n, value) for name, value in self.fixed.items()}
+        for j, name in enumerate(SEARCH_FIELDS):
+            columns[name] = self.levels[j][states[:, j]]
+
+        self.evaluated += n
+        return self.model.predict_proba(self.pipeline.transform_batch(columns))
+
+
+def _margins(probabilities: np.ndarray, target_index: int) -> np.ndarray:
+    others = np.delete(probabilities, target_index, axis=1)
+    return probabilities[:, target_index] - others.max(axis=1)
+
+
+def _state_keys(states: np.ndarray) -> np.ndarray:
+    # Mixed-radix encoding (at most 5 levels per field) for cheap dedup.
+    radix = 5 ** np.arange(states.shape[1], dtype=np.int64)
+    return states.astype(np.int64) @ radix
+
+
+def _moves(n_fields: int, unlocked: np.ndarray) -> np.ndarray:
+    """
+    (n_moves, n_fields) single-step deltas: +1 and -1 on each unlocked field.
+    """
+    eye = np.eye(n_fields, dtype=np.int8)[unlocked]
+    return np.concatenate([eye, -eye])
+
+
+def search_counterfactuals(
+    project,
+    target: str,
+    max_results: int = 3,
+    beam_width: int = 64,
+    max_changes: int = 8,
+    time_budget_ms: float = 500,
+    locked_fields=(),
+) -> dict:
+    start = time.perf_counter()
+    deadline = start + time_budget_ms / 1000
+
+    class_labels = get_class_labels()
+    if target not in class_labels:
+        raise ValueError(f"Unknown target '{target}'; expected one of {class_labels}")
+    target_index = class_labels.index(target)
+
+    unknown = sorted(set(locked_fields) - set(SEARCH_SPACE))
+    if unknown:
+        raise ValueError(f"Cannot lock non-searchable fields: {unknown}")
+
+    score = _Scorer(project)
+    n_fields = len(SEARCH_FIELDS)
+    sizes = np.array([len(SEARCH_SPACE[name]) for name in SEARCH_FIELDS])
+    original = np.array(
+        [SEARCH_SPACE[name].index(getattr(project, name)) for name in SEARCH_FIELDS],
+        dtype=np.int8,
+    )
+
+    base_proba = score(original[None, :])[0]
+    current = class_labels[int(base_proba.argmax())]
+
+    response = {
+        "target": target,
+        "current_recommendation": current,
+        "current_target_probability": round(float(base_proba[target_index]), 4),
+        "counterfactuals": [],
+    }
+
+    if current == target:
+        return {
+            **response,
+            "already_recommended": True,
+            "evaluated": score.evaluated,
+            "depth_reached": 0,
+            "complete": True,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    unlocked = np.array([name not in locked_fields for name in SEARCH_FIELDS])
+    moves = _moves(n_fields, unlocked)
+
+    frontier = original[None, :]
+    visited = {int(_state_keys(frontier)[0])}
+    solutions = []  # (cost, n_changed, -margin, state, probabilities)
+    complete = True
+    depth = 0
+
+    while depth < max_changes and len(frontier) and len(solutions) < max_results:
+        if time.perf_counter() >= deadline:
+            complete = False
+            break
+        depth += 1
+
+        # Expand the whole beam at once and drop out-of-range / seen states.
+        candidates = (frontier[:, None, :] + moves[None, :, :]).reshape(-1, n_fields)
+        in_range = ((candidates >= 0) & (candidates < sizes)).all(axis=1)
+        candidates = candidates[in_range]
+
+        keys, first = np.unique(_state_keys(candidates), return_index=True)
+        fresh = np.fromiter((int(k) not in visited for k in keys), dtype=bool, count=len(keys))
+        candidates = candidates[first[fresh]]
+        visited.update(int(k) for k in keys[fresh])
+        if not len(candidates):
+            break
+
+        scored_states, scored_proba = [], []
+        for offset in range(0, len(candidates), SCORE_CHUNK):
+            if time.perf_counter() >= deadline:
+                complete = False
+                break
+            chunk = candidates[offset:offset + SCORE_CHUNK]
+            scored_states.append(chunk)
+            scored_proba.append(score(chunk))
+        if not scored_states:
+            break
+
+        states = np.concatenate(scored_states)
+        proba = np.concatenate(scored_proba)
+        margins = _margins(proba, target_index)
+        hit = margins > 0
+
+        costs = np.abs(states.astype(np.int16) - original).sum(axis=1)
+        changed = (states != original).sum(axis=1)
+        for i in np.flatnonzero(hit):
+            solutions.append((int(costs[i]), int(changed[i]), -float(margins[i]), states[i], proba[i]))
+
+        # Beam: best non-solutions by margin, cheaper first on ties.
+        rest = np.flatnonzero(~hit)
+        order = np.lexsort((costs[rest], -margins[rest]))[:beam_width]
+        frontier = states[rest[order]]
+
+        if not complete:
+            break
+
+    solutions.sort(key=lambda s: s[:3])
+    counterfactuals, accepted = [], []
+    for cost, _, negative_margin, state, proba in solutions:
+        change_set = {(j, int(state[j])) for j in np.flatnonzero(state != original)}
+        # Skip solutions that only add changes on top of an accepted one.
+        if any(previous <= change_set for previous in accepted):
+            continue
+        accepted.append(change_set)
+        counterfactuals.append({
+            "changes": [
+                {
+                    "field": SEARCH_FIELDS[j],
+                    "from": SEARCH_SPACE[SEARCH_FIELDS[j]][original[j]],
+                    "to": SEARCH_SPACE[SEARCH_FIELDS[j]][state[j]],
+                }
+                for j in sorted(j for j, _ in change_set)
+            ],
+            "cost": cost,
+            "target_probability": round(float(proba[target_index]), 4),
+            "margin": round(-negative_margin, 4),
+        })
+        if len(counterfactuals) == max_results:
+            break
+
+    return {
+        **response,
+        "counterfactuals": counterfactuals,
+        "evaluated": score.evaluated,
+        "depth_reached": depth,
+        "complete": complete,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
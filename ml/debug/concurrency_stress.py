@@ -0,0 +1,199 @@
+"""
+CONCURRENCY STRESS TEST - Init races, result correctness, throughput scaling
+
+    python ml/debug/concurrency_stress.py [--requests 400] [--threads 1,2,4,8]
+
+1. Cold init race: model, metadata, encoder and SHAP explainer state is
+   reset and N threads released by a barrier initialise them at once;
+   every thread must get the same explainer and no thread may fail.
+2. Correctness: seeded random projects are scored serially for reference,
+   then re-scored at each concurrency level; recommendations, probabilities
+   and SHAP factors must match exactly.
+3. Throughput: requests/second per concurrency level and speedup vs 1.
+   With a single available core there is nothing to scale onto, so the
+   speedup is not reported and scaling is marked unverified; the
+   correctness check still runs at every level.
+4. Log appends: concurrent log_prediction calls into a temp file must give
+   one header and exactly one intact row per call.
+
+Exits non-zero on any failure. Thread sizing comes from ml.thread_config.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml.thread_config import apply_native_thread_limits, available_cores, get_thread_config
+
+apply_native_thread_limits()
+
+import numpy as np
+
+from backend.schemas.project_schema import ProjectInput
+from backend.utils import prediction_logger
+from ml import model_loader, predictor
+
+
+def _random_projects(n: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    projects = []
+    for _ in range(n):
+        projects.append(ProjectInput(
+            project_budget=float(rng.integers(20_000, 5_000_000)),
+            project_duration_months=int(rng.integers(1, 61)),
+            team_size=int(rng.integers(1, 51)),
+            number_of_integrations=int(rng.integers(0, 21)),
+            **{name: int(rng.integers(1, 6)) for name in (
+                "team_experience_level", "agile_maturity_level", "requirement_clarity",
+                "client_involvement_level", "regulatory_strictness", "system_complexity",
+                "automation_level", "delivery_urgency",
+            )},
+            **{name: int(rng.choice([1, 3, 5])) for name in (
+                "requirement_change_frequency", "decision_making_speed",
+                "domain_criticality", "risk_tolerance_level",
+            )},
+        ))
+    return projects
+
+
+def _score(project) -> tuple:
+    result, _ = predictor._build_ml_result(project, explain=True)
+    return (
+        result["recommended"],
+        tuple(sorted(result["risks"].items())),
+        tuple((f["feature"], round(f["impact"], 10)) for f in result["top_contributing_factors"]),
+        result["explainability_source"],
+    )
+
+
+def check_init_race(n_threads: int) -> list:
+    model_loader._model = None
+    model_loader._metadata = None
+    model_loader._label_encoder = None
+    model_loader._feature_pipeline = None
+    predictor._SHAP_EXPLAINER = None
+    predictor._SHAP_INIT_ERROR = None
+    predictor._SHAP_INIT_ATTEMPTED = False
+
+    barrier = threading.Barrier(n_threads)
+    explainers, errors = [], []
+
+    def init():
+        barrier.wait()
+        try:
+            explainers.append(id(predictor._get_shap_explainer()))
+        except Exception as error:
+            errors.append(repr(error))
+
+    threads = [threading.Thread(target=init) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    failures = [f"init error: {error}" for error in errors]
+    if len(set(explainers)) > 1:
+        failures.append(f"{len(set(explainers))} distinct explainers built")
+    return failures
+
+
+def check_scaling(projects: list, levels: list, measure_speedup: bool = True) -> tuple:
+    reference = [_score(p) for p in projects]
+    failures, rows = [], []
+    base = None
+
+    for n_threads in levels:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(n_threads) as pool:
+            results = list(pool.map(_score, projects))
+        elapsed = time.perf_counter() - start
+
+        mismatches = sum(r != ref for r, ref in zip(results, reference))
+        if mismatches:
+            failures.append(f"{mismatches} results differ from serial reference at {n_threads} threads")
+
+        throughput = len(projects) / elapsed
+        base = base or throughput
+        rows.append((n_threads, throughput, throughput / base if measure_speedup else None, mismatches))
+    return failures, rows
+
+
+def check_log_appends(n_threads: int, per_thread: int) -> list:
+    features = {name: 0.5 for name in prediction_logger.FEATURE_ORDER}
+    result = {
+        "recommended": "Agile", "confidence": 0.5, "model_version": "stress",
+        "inference_time": 0.001, "risks": {"Agile": 0.5, "Waterfall": 0.5},
+    }
+
+    original = prediction_logger.LOG_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        prediction_logger.LOG_PATH = Path(tmp) / "predictions.csv"
+        try:
+            def write(t):
+                for i in range(per_thread):
+                    prediction_logger.log_prediction(f"{t}-{i}", features, result)
+
+            with ThreadPoolExecutor(n_threads) as pool:
+                list(pool.map(write, range(n_threads)))
+
+            with open(prediction_logger.LOG_PATH, newline="") as file:
+                lines = file.read().splitlines()
+            with open(prediction_logger.LOG_PATH, newline="") as file:
+                rows = list(csv.DictReader(file))
+        finally:
+            prediction_logger.LOG_PATH = original
+
+    failures = []
+    expected = n_threads * per_thread
+    headers = sum(line.startswith("project_id,") for line in lines)
+    if headers != 1:
+        failures.append(f"log has {headers} header lines")
+    if len(rows) != expected or len({r["project_id"] for r in rows}) != expected:
+        failures.append(f"log has {len(rows)} rows, expected {expected} distinct")
+    if any(None in r or r["model_version"] != "stress" for r in rows):
+        failures.append("log has malformed rows")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrency stress test for inference.")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", default="1,2,4,8")
+    args = parser.parse_args(argv)
+    levels = [int(n) for n in args.threads.split(",")]
+
+    print("Thread config:", get_thread_config())
+
+    failures = check_init_race(max(levels) * 2)
+    print(f"Init race ({max(levels) * 2} threads): {'ok' if not failures else failures}")
+
+    cores = available_cores()
+    scaling_failures, rows = check_scaling(_random_projects(args.requests), levels, measure_speedup=cores > 1)
+    failures += scaling_failures
+    print(f"\n{'threads':>7} {'req/s':>9} {'speedup':>8} {'mismatches':>11}")
+    for n_threads, throughput, speedup, mismatches in rows:
+        speedup = f"{speedup:>7.2f}x" if speedup is not None else f"{'n/a':>8}"
+        print(f"{n_threads:>7} {throughput:>9.1f} {speedup} {mismatches:>11}")
+    if cores == 1:
+        print("⚠️  1 core available: throughput scaling NOT verified (correctness only).")
+
+    log_failures = check_log_appends(max(levels), 200)
+    failures += log_failures
+    print(f"\nConcurrent log appends: {'ok' if not log_failures else log_failures}")
+
+    if failures:
+        print("\n❌ FAILED:", *failures, sep="\n  ")
+        sys.exit(1)
+    print("\n✅ All concurrency checks passed.")
+
+
+if __name__ == "__main__":
+    main()
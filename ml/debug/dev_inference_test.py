@@ -7,7 +7,7 @@ import shap
 # 🔹 PATH CONFIGURATION
 # --------------------------------------------------
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-MODEL_PATH = os.path.join(BASE_DIR, "model", "xgb_sdlc_model.pkl")
+MODEL_PATH = os.path.join(BASE_DIR, "model", "model.pkl")
 ENCODER_PATH = os.path.join(BASE_DIR, "model", "label_encoder.pkl")
 
 # --------------------------------------------------
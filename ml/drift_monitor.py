@@ -0,0 +1,268 @@
+"""
+DRIFT MONITOR - Streaming feature and class-mix drift
+
+Reference statistics (per-feature mean/std, decile bin edges and bin
+proportions, class mix) are written by the trainer to
+model/drift_reference.json. Live traffic is folded into fixed-size
+counters on every prediction, so memory stays constant and the per-request
+cost is a single vectorised bin lookup.
+
+Below min_samples live predictions (SDLC_DRIFT_MIN_SAMPLES, default
+DEFAULT_MIN_SAMPLES) the report has status "insufficient_data" and no
+PSI / KS scores or drift flags: with a handful of rows nearly every bin is
+empty and every feature would read as drifted.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# PATH CONFIGURATION
+# =========================
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+DRIFT_REFERENCE_PATH = BASE_DIR / "model" / "drift_reference.json"
+
+REFERENCE_BIN_COUNT = 10
+
+# Ten expected rows per decile bin.
+DEFAULT_MIN_SAMPLES = 100
+
+# Smoothing applied to empty bins so PSI stays finite.
+_PSI_EPSILON = 1e-4
+
+
+# =========================
+# REFERENCE (TRAIN TIME)
+# =========================
+
+def build_drift_reference(X, y, model_version: str, bin_count: int = REFERENCE_BIN_COUNT) -> dict:
+    """
+    Summarise a training frame into drift reference statistics.
+
+    X is a DataFrame of engineered features, y the matching class labels.
+    """
+    quantiles = np.linspace(0, 1, bin_count + 1)[1:-1]
+    features = {}
+
+    for name in X.columns:
+        values = X[name].to_numpy(dtype=float)
+        edges = np.quantile(values, quantiles)
+        bins = np.searchsorted(edges, values, side="right")
+        counts = np.bincount(bins, minlength=bin_count)
+
+        features[name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "bin_edges": [float(edge) for edge in edges],
+            "bin_proportions": [float(c) for c in counts / len(values)],
+        }
+
+    class_counts = y.value_counts(normalize=True)
+
+    return {
+        "model_version": model_version,
+        "sample_count": int(len(X)),
+        "features": features,
+        "class_mix": {str(label): float(share) for label, share in class_counts.items()},
+    }
+
+
+# =========================
+# SCORING HELPERS
+# =========================
+
+def _psi(actual: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    actual = np.clip(actual, _PSI_EPSILON, None)
+    expected = np.clip(expected, _PSI_EPSILON, None)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=-1)
+
+
+def _drift_status(psi: float) -> str:
+    if psi < 0.1:
+        return "stable"
+    if psi < 0.25:
+        return "moderate"
+    return "significant"
+
+
+# =========================
+# STREAMING MONITOR
+# =========================
+
+class DriftMonitor:
+    """
+    Constant-memory accumulator for live feature and class statistics.
+    """
+
+    def __init__(self, reference: dict, min_samples: int = DEFAULT_MIN_SAMPLES):
+        self.reference = reference
+        self.min_samples = min_samples
+        self.feature_names = list(reference["features"])
+
+        stats = [reference["features"][name] for name in self.feature_names]
+        self._edges = np.array([s["bin_edges"] for s in stats], dtype=float)
+        self._ref_props = np.array([s["bin_proportions"] for s in stats], dtype=float)
+        self._ref_mean = np.array([s["mean"] for s in stats], dtype=float)
+        self._ref_std = np.array([s["std"] for s in stats], dtype=float)
+        self._rows = np.arange(len(self.feature_names))
+
+        self._class_labels = list(reference["class_mix"])
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._count = 0
+            self._bin_counts = np.zeros(self._ref_props.shape, dtype=np.int64)
+            # Welford running mean / sum of squared deviations.
+            self._mean = np.zeros(len(self.feature_names))
+            self._m2 = np.zeros(len(self.feature_names))
+            self._class_counts = dict.fromkeys(self._class_labels, 0)
+            self._other_class_count = 0
+
+    def update(self, features: dict, recommended: str):
+        vector = np.fromiter(
+            (features[name] for name in self.feature_names),
+            dtype=float,
+            count=len(self.feature_names),
+        )
+        bins = (vector[:, None] >= self._edges).sum(axis=1)
+
+        with self._lock:
+            self._count += 1
+            self._bin_counts[self._rows, bins] += 1
+
+            delta = vector - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (vector - self._mean)
+
+            if recommended in self._class_counts:
+                self._class_counts[recommended] += 1
+            else:
+                self._other_class_count += 1
+
+    def report(self) -> dict:
+        with self._lock:
+            count = self._count
+            bin_counts = self._bin_counts.copy()
+            mean = self._mean.copy()
+            m2 = self._m2.copy()
+            class_counts = dict(self._class_counts)
+            other_class_count = self._other_class_count
+
+        base = {
+            "reference_model_version": self.reference.get("model_version"),
+            "reference_sample_count": self.reference.get("sample_count"),
+            "sample_count": count,
+            "min_samples": self.min_samples,
+        }
+
+        if count < self.min_samples:
+            return {**base, "status": "insufficient_data", "drifted_features": [], "features": {}, "class_mix": {}}
+
+        live_props = bin_counts / count
+        psi = _psi(live_props, self._ref_props)
+        ks = np.abs(
+            np.cumsum(live_props, axis=1) - np.cumsum(self._ref_props, axis=1)
+        ).max(axis=1)
+        live_std = np.sqrt(m2 / count)
+        safe_ref_std = np.where(self._ref_std > 0, self._ref_std, 1.0)
+        mean_shift = (mean - self._ref_mean) / safe_ref_std
+
+        features = {
+            name: {
+                "psi": round(float(psi[i]), 4),
+                "ks": round(float(ks[i]), 4),
+                "mean": round(float(mean[i]), 4),
+                "std": round(float(live_std[i]), 4),
+                "reference_mean": round(float(self._ref_mean[i]), 4),
+                "mean_shift_in_std": round(float(mean_shift[i]), 4),
+                "status": _drift_status(float(psi[i])),
+            }
+            for i, name in enumerate(self.feature_names)
+        }
+
+        # Predictions outside the reference labels (e.g. baseline "Hybrid")
+        # are folded into an extra bucket with zero expected share.
+        live_mix = np.array(
+            [class_counts[label] for label in self._class_labels] + [other_class_count],
+            dtype=float,
+        ) / count
+        ref_mix = np.array(
+            [self.reference["class_mix"][label] for label in self._class_labels] + [0.0]
+        )
+        class_psi = float(_psi(live_mix, ref_mix))
+
+        return {
+            **base,
+            "status": "ok",
+            "max_feature_psi": round(float(psi.max()), 4),
+            "drifted_features": [
+                name for name, stats in features.items() if stats["status"] == "significant"
+            ],
+            "features": features,
+            "class_mix": {
+                "psi": round(class_psi, 4),
+                "status": _drift_status(class_psi),
+                "live": {
+                    **{label: round(float(live_mix[i]), 4) for i, label in enumerate(self._class_labels)},
+                    "other": round(float(live_mix[-1]), 4),
+                },
+                "reference": self.reference["class_mix"],
+            },
+        }
+
+
+# =========================
+# CACHED INSTANCE
+# =========================
+
+_monitor = None
+_monitor_error = None
+_monitor_lock = threading.Lock()
+
+
+def get_drift_monitor() -> DriftMonitor:
+    global _monitor, _monitor_error
+
+    if _monitor is not None:
+        return _monitor
+
+    with _monitor_lock:
+        if _monitor is None:
+            if _monitor_error is not None:
+                raise _monitor_error
+
+            if not DRIFT_REFERENCE_PATH.exists():
+                _monitor_error = FileNotFoundError(
+                    f"Drift reference not found at {DRIFT_REFERENCE_PATH}"
+                )
+                raise _monitor_error
+
+            with open(DRIFT_REFERENCE_PATH, "r", encoding="utf-8") as f:
+                _monitor = DriftMonitor(
+                    json.load(f),
+                    min_samples=int(os.getenv("SDLC_DRIFT_MIN_SAMPLES", DEFAULT_MIN_SAMPLES)),
+                )
+
+    return _monitor
+
+
+def record_prediction(features: dict, result: dict):
+    """
+    Fold one served prediction into the drift counters. Never raises.
+    """
+    try:
+        get_drift_monitor().update(features, result["recommended"])
+    except Exception as error:
+        logger.debug("Drift monitor update skipped: %s", error)
@@ -1,23 +1,29 @@
+"""
+Model column order for ml_v1, as trained (pandas column order of
+data/sdlc_dataset_1800.csv). model/model_metadata.json is authoritative;
+ml.feature_pipeline checks it against the booster at load time.
+"""
+
 FEATURE_ORDER = [
-    "schedule_pressure_index",
-    "budget_adequacy_ratio",
     "project_scale_index",
+    "budget_adequacy_ratio",
+    "schedule_pressure_index",
     "team_capacity_index",
     "team_experience_score",
     "requirements_volatility",
     "requirements_clarity_score",
-    "change_request_intensity",
     "scope_complexity_index",
+    "change_request_intensity",
     "process_maturity_score",
-    "client_engagement_score",
+    "sprint_discipline_score",
     "decision_latency_index",
     "risk_management_maturity",
-    "sprint_discipline_score",
+    "client_engagement_score",
     "technical_complexity_index",
     "integration_risk_index",
     "automation_maturity_score",
-    "legacy_dependency_index",
     "toolchain_reliability_score",
+    "legacy_dependency_index",
     "regulatory_risk_index",
     "domain_criticality_index",
     "external_dependency_risk",
@@ -0,0 +1,182 @@
+"""
+COMPILED FEATURE PIPELINE - ProjectInput straight to a model-ordered vector
+
+Compiled once per model from the metadata feature order (the authoritative
+column order) and checked against the feature names stored in the trained
+booster, so a schema mismatch fails at load time instead of silently
+scrambling columns. At request time the 28 engineered values are written
+directly into a float array in model column order; no intermediate dicts
+are built.
+
+The formulas mirror backend.utils.preprocessing.generate_engineered_features
+and work unchanged on scalars (one project) or NumPy columns (a batch).
+"""
+
+import numpy as np
+
+from backend.ml.feature_config import FEATURE_ORDER as ENGINEERED_FEATURES
+
+# Raw ProjectInput fields consumed by the pipeline, in argument order.
+RAW_INPUT_FIELDS = [
+    "project_budget",
+    "project_duration_months",
+    "team_size",
+    "number_of_integrations",
+    "team_experience_level",
+    "agile_maturity_level",
+    "requirement_clarity",
+    "client_involvement_level",
+    "regulatory_strictness",
+    "system_complexity",
+    "automation_level",
+    "delivery_urgency",
+    "requirement_change_frequency",
+    "decision_making_speed",
+    "domain_criticality",
+    "risk_tolerance_level",
+]
+
+
+def _engineered_values(
+    budget, duration, team_size, integrations,
+    experience, agile, clarity, client, regulatory, complexity,
+    automation, urgency, change_frequency, decision_speed, criticality, risk_tolerance,
+) -> tuple:
+    """
+    Engineered features in ENGINEERED_FEATURES order from raw inputs.
+    """
+    # 1–5 scale inputs normalised to 0–1.
+    experience = (experience - 1) / 4
+    agile = (agile - 1) / 4
+    clarity = (clarity - 1) / 4
+    client = (client - 1) / 4
+    regulatory = (regulatory - 1) / 4
+    complexity = (complexity - 1) / 4
+    automation = (automation - 1) / 4
+    urgency = (urgency - 1) / 4
+    change_frequency = (change_frequency - 1) / 4
+    decision_speed = (decision_speed - 1) / 4
+    criticality = (criticality - 1) / 4
+    risk_tolerance = (risk_tolerance - 1) / 4
+
+    integration_risk = integrations / 20
+
+    return (
+        # STRUCTURE & SCALE
+        budget / 1_000_000 + team_size / 50,
+        budget / (team_size * 10000),
+        urgency / (duration / 12),
+        team_size * experience,
+        experience,
+        1 - criticality,
+
+        # REQUIREMENTS & SCOPE
+        change_frequency,
+        clarity,
+        complexity,
+        client,
+        change_frequency,
+
+        # PROCESS & GOVERNANCE
+        agile,
+        agile,
+        1 - decision_speed,
+        agile,
+        client,
+
+        # TECHNICAL RISK
+        complexity,
+        integration_risk,
+        automation,
+        automation,
+        complexity,
+
+        # ENVIRONMENT & EXTERNAL
+        regulatory,
+        criticality,
+        integration_risk,
+
+        # DELIVERY PRESSURE
+        urgency,
+        experience,
+        risk_tolerance,
+        (change_frequency + complexity + regulatory) / 3,
+    )
+
+
+class FeaturePipeline:
+    """
+    Engineered-feature transform bound to one model's column order.
+    """
+
+    def __init__(self, feature_order: list):
+        feature_order = list(feature_order)
+
+        if len(set(feature_order)) != len(feature_order):
+            raise ValueError("Feature order contains duplicate features")
+
+        missing = sorted(set(ENGINEERED_FEATURES) - set(feature_order))
+        unknown = sorted(set(feature_order) - set(ENGINEERED_FEATURES))
+        if missing or unknown:
+            raise ValueError(
+                f"Feature schema mismatch: missing={missing} unknown={unknown}"
+            )
+
+        self.feature_order = feature_order
+        self.n_features = len(feature_order)
+        # Column in the model vector for each engineered value.
+        self._positions = np.array(
+            [feature_order.index(name) for name in ENGINEERED_FEATURES], dtype=np.intp
+        )
+
+    def transform(self, project, out: np.ndarray = None) -> np.ndarray:
+        """
+        One ProjectInput into a 1-D float vector in model column order.
+        """
+        if out is None:
+            out = np.empty(self.n_features, dtype=np.float64)
+
+        out[self._positions] = _engineered_values(
+            *(getattr(project, name) for name in RAW_INPUT_FIELDS)
+        )
+        return out
+
+    def transform_batch(self, columns, out: np.ndarray = None) -> np.ndarray:
+        """
+        Raw input columns (mapping of RAW_INPUT_FIELDS to equal-length
+        arrays) into an (n, n_features) matrix in model column order.
+        """
+        arrays = [np.asarray(columns[name], dtype=np.float64) for name in RAW_INPUT_FIELDS]
+        n_rows = len(arrays[0])
+
+        if out is None:
+            out = np.empty((n_rows, self.n_features), dtype=np.float64)
+
+        for position, values in zip(self._positions, _engineered_values(*arrays)):
+            out[:, position] = values
+        return out
+
+    def as_dict(self, vector) -> dict:
+        """
+        Named view of a vector, for logging and monitoring.
+        """
+        return dict(zip(self.feature_order, vector.tolist()))
+
+
+def compile_feature_pipeline(feature_order: list, model=None) -> FeaturePipeline:
+    """
+    Build the pipeline for a metadata feature order. When the trained model
+    carries feature names they must match that order exactly.
+    """
+    pipeline = FeaturePipeline(feature_order)
+
+    trained_names = None
+    if model is not None and hasattr(model, "get_booster"):
+        trained_names = model.get_booster().feature_names
+
+    if trained_names is not None and list(trained_names) != pipeline.feature_order:
+        raise ValueError(
+            "Metadata feature_order does not match the feature order the model was trained on"
+        )
+
+    return pipeline
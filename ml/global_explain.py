@@ -0,0 +1,254 @@
+"""
+GLOBAL EXPLANATIONS - Mean |SHAP| importance and PDP / ICE curves
+
+Computed off the request path by a background job over the training
+projects plus the most recent logged predictions, in batched SHAP and
+predict_proba passes:
+
+- importance: mean |SHAP| per feature for each SDLC class, and overall
+- pdp: for every feature, a quantile grid and the mean class probability
+  at each grid point with all other features held at their observed values
+- ice: the individual curves behind each PDP for a fixed sample of rows
+
+Results are cached per model_version and bundle fingerprint (content hash
+of the bundle manifest, since retrains reuse model_version) in memory and
+on disk (model/.cache/global_explain-<model_version>-<fingerprint>.json),
+so /explain/global never recomputes and a retrained model gets fresh
+results on its first start; a refresh reruns the job in the background.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.prediction_store import get_prediction_store
+from ml.model_loader import (
+    get_class_labels,
+    get_feature_order,
+    get_model_fingerprint,
+    load_metadata,
+    load_model,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+TRAINING_DATA_PATH = BASE_DIR / "data" / "sdlc_dataset_1800.csv"
+CACHE_DIR = BASE_DIR / "model" / ".cache"
+
+MAX_LOGGED_ROWS = 20_000
+SHAP_BATCH = 1024
+PDP_GRID_POINTS = 20
+PDP_SAMPLE_ROWS = 300
+ICE_CURVES = 25
+SEED = 42
+
+
+# =========================
+# DATA
+# =========================
+
+def _training_matrix(feature_order: list) -> np.ndarray:
+    if not TRAINING_DATA_PATH.exists():
+        return np.empty((0, len(feature_order)))
+
+    df = pd.read_csv(TRAINING_DATA_PATH)
+    return df.loc[df["is_best"] == 1, feature_order].to_numpy(dtype=np.float64)
+
+
+def _logged_matrix(feature_order: list) -> np.ndarray:
+    rows = get_prediction_store().page(columns=feature_order, limit=MAX_LOGGED_ROWS)
+    if not rows:
+        return np.empty((0, len(feature_order)))
+
+    matrix = pd.DataFrame(rows, columns=feature_order).to_numpy(dtype=np.float64)
+    return matrix[~np.isnan(matrix).any(axis=1)]
+
+
+# =========================
+# COMPUTATION
+# =========================
+
+def _mean_abs_shap(model, X: np.ndarray, n_classes: int) -> np.ndarray:
+    """
+    (n_classes, n_features) mean |SHAP| over X, in SHAP_BATCH row passes.
+    """
+    import shap
+
+    explainer = shap.TreeExplainer(model)
+    totals = np.zeros((n_classes, X.shape[1]))
+
+    for offset in range(0, len(X), SHAP_BATCH):
+        values = explainer.shap_values(X[offset:offset + SHAP_BATCH])
+        if isinstance(values, list):
+            values = np.stack(values, axis=-1)
+        values = np.asarray(values)
+        totals += np.abs(values).sum(axis=0).T
+
+    return totals / len(X)
+
+
+def _partial_dependence(model, X: np.ndarray, feature_order: list, class_labels: list, rng) -> dict:
+    sample = X[rng.choice(len(X), size=min(PDP_SAMPLE_ROWS, len(X)), replace=False)]
+    ice_rows = np.arange(min(ICE_CURVES, len(sample)))
+    n, n_grid = len(sample), PDP_GRID_POINTS
+
+    curves = {}
+    for j, name in enumerate(feature_order):
+        grid = np.unique(np.quantile(X[:, j], np.linspace(0, 1, n_grid)))
+
+        # One predict_proba over every (grid point, sample row) pair.
+        batch = np.tile(sample, (len(grid), 1))
+        batch[:, j] = np.repeat(grid, n)
+        proba = model.predict_proba(batch).reshape(len(grid), n, len(class_labels))
+
+        curves[name] = {
+            "grid": [round(float(v), 4) for v in grid],
+            "pdp": {
+                label: [round(float(v), 4) for v in proba[:, :, c].mean(axis=1)]
+                for c, label in enumerate(class_labels)
+            },
+            "ice": {
+                label: proba[:, ice_rows, c].T.round(4).tolist()
+                for c, label in enumerate(class_labels)
+            },
+        }
+    return curves
+
+
+def compute_global_explanations() -> dict:
+    start = time.perf_counter()
+
+    model = load_model()
+    feature_order = get_feature_order()
+    class_labels = get_class_labels()
+
+    training = _training_matrix(feature_order)
+    logged = _logged_matrix(feature_order)
+    X = np.vstack([training, logged])
+    if not len(X):
+        raise ValueError("No training or logged rows available for global explanations")
+
+    shap_importance = _mean_abs_shap(model, X, len(class_labels))
+    overall = shap_importance.mean(axis=0)
+    ranked = np.argsort(-overall)
+
+    return {
+        "model_version": load_metadata().get("model_version"),
+        "model_fingerprint": get_model_fingerprint(),
+        "computed_at": datetime.utcnow().isoformat(),
+        "rows": {"training": len(training), "logged": len(logged)},
+        "importance": {
+            "overall": {feature_order[j]: round(float(overall[j]), 5) for j in ranked},
+            "by_class": {
+                label: {feature_order[j]: round(float(shap_importance[c, j]), 5) for j in ranked}
+                for c, label in enumerate(class_labels)
+            },
+        },
+        "partial_dependence": _partial_dependence(
+            model, X, feature_order, class_labels, np.random.default_rng(SEED)
+        ),
+        "compute_seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+# =========================
+# CACHE + BACKGROUND JOB
+# =========================
+
+_results = {}
+_state = {"running": False, "error": None}
+_lock = threading.Lock()
+
+
+def _result_key(model_version: str, fingerprint: str) -> str:
+    return f"{model_version}-{fingerprint}"
+
+
+def _current_key() -> str:
+    return _result_key(load_metadata().get("model_version"), get_model_fingerprint())
+
+
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"global_explain-{key}.json"
+
+
+def _run_job():
+    try:
+        result = compute_global_explanations()
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        key = _result_key(result["model_version"], result["model_fingerprint"])
+        path = _cache_path(key)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+        with _lock:
+            _results[key] = result
+            _state["error"] = None
+        logger.info("Global explanations computed in %.2fs", result["compute_seconds"])
+    except Exception as error:
+        logger.error("Global explanation job failed: %s", error)
+        with _lock:
+            _state["error"] = str(error)
+    finally:
+        with _lock:
+            _state["running"] = False
+
+
+def start_global_explain_job(refresh: bool = False) -> bool:
+    """
+    Load the cached result for the loaded bundle, or compute it on a
+    background thread. Returns False when a job is already running.
+    """
+    key = _current_key()
+
+    with _lock:
+        if _state["running"]:
+            return False
+
+        if not refresh:
+            if key in _results:
+                return True
+            path = _cache_path(key)
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    _results[key] = json.load(f)
+                return True
+
+        _state["running"] = True
+
+    threading.Thread(target=_run_job, name="sdlc-global-explain", daemon=True).start()
+    return True
+
+
+def get_global_explanations(model_version: str = None):
+    """
+    (result or None, status) for the loaded bundle. A model_version other
+    than the loaded one returns its most recent in-memory result.
+    """
+    current_version = load_metadata().get("model_version")
+    current_key = _current_key()
+
+    with _lock:
+        if model_version is None or model_version == current_version:
+            result = _results.get(current_key)
+        else:
+            matches = [r for r in _results.values() if r["model_version"] == model_version]
+            result = max(matches, key=lambda r: r["computed_at"]) if matches else None
+        if result is not None:
+            status = "ready"
+        elif _state["running"]:
+            status = "computing"
+        else:
+            status = "unavailable"
+        return result, {"status": status, "running": _state["running"], "error": _state["error"]}
@@ -0,0 +1,315 @@
+"""
+MODEL BUNDLE - Native XGBoost artifact with a checksummed manifest
+
+A bundle directory holds:
+
+    model.ubj             xgboost native binary (UBJSON) model
+    model.pkl             joblib pickle of the same model (fallback reader)
+    label_encoder.pkl     fitted LabelEncoder
+    model_metadata.json   feature order, class labels, model version
+    manifest.json         SHA-256 + size of every file above
+
+The native model is hashed through a memory map (no Python-side copy)
+and then parsed by xgboost straight from the file; the file's identity,
+size and mtime must be unchanged across the two, so a bundle replaced
+mid-load is refused. It does not depend on the pickling Python / xgboost
+versions.
+
+    python -m ml.model_bundle export [--bundle model]    # write model.ubj + manifest from model.pkl
+    python -m ml.model_bundle verify [--bundle model]
+    python -m ml.model_bundle benchmark [--bundle model] [--repeat 20]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_BUNDLE_DIR = BASE_DIR / "model"
+
+MANIFEST_NAME = "manifest.json"
+NATIVE_MODEL_NAME = "model.ubj"
+PICKLE_MODEL_NAME = "model.pkl"
+ENCODER_NAME = "label_encoder.pkl"
+METADATA_NAME = "model_metadata.json"
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+class BundleIntegrityError(ValueError):
+    pass
+
+
+# =========================
+# HASHING
+# =========================
+
+def _map_file(path: Path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def file_sha256(path) -> str:
+    buffer = _map_file(Path(path))
+    try:
+        return hashlib.sha256(buffer).hexdigest()
+    finally:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+
+def _entry(path: Path) -> dict:
+    return {"sha256": file_sha256(path), "bytes": path.stat().st_size}
+
+
+# =========================
+# WRITE
+# =========================
+
+def write_manifest(bundle_dir) -> dict:
+    """
+    Checksum every bundle file present in bundle_dir into manifest.json.
+    """
+    import xgboost
+
+    bundle_dir = Path(bundle_dir)
+    files = {
+        name: _entry(bundle_dir / name)
+        for name in (NATIVE_MODEL_NAME, PICKLE_MODEL_NAME, ENCODER_NAME, METADATA_NAME)
+        if (bundle_dir / name).exists()
+    }
+
+    for required in (NATIVE_MODEL_NAME, ENCODER_NAME, METADATA_NAME):
+        if required not in files:
+            raise FileNotFoundError(f"Bundle file not found at {bundle_dir / required}")
+
+    manifest = {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "xgboost_version": xgboost.__version__,
+        "python_version": platform.python_version(),
+        "files": files,
+    }
+
+    tmp_path = bundle_dir / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, bundle_dir / MANIFEST_NAME)
+
+    return manifest
+
+
+def write_bundle(model, label_encoder, metadata: dict, bundle_dir, include_pickle: bool = True) -> dict:
+    """
+    Write a complete bundle: native model, optional pickle fallback,
+    encoder, metadata and finally the manifest.
+    """
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    model.save_model(bundle_dir / NATIVE_MODEL_NAME)
+    if include_pickle:
+        joblib.dump(model, bundle_dir / PICKLE_MODEL_NAME)
+    joblib.dump(label_encoder, bundle_dir / ENCODER_NAME)
+
+    with open(bundle_dir / METADATA_NAME, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+        f.write("\n")
+
+    return write_manifest(bundle_dir)
+
+
+# =========================
+# IDENTITY
+# =========================
+
+def bundle_fingerprint(bundle_dir, manifest: dict = None) -> str:
+    """
+    Short content hash identifying a bundle: over the manifest's file
+    checksums (not its timestamp, so re-exporting identical files keeps
+    it), or over the model and metadata files of a manifest-less bundle.
+    """
+    bundle_dir = Path(bundle_dir)
+    if manifest is not None:
+        checksums = {name: entry["sha256"] for name, entry in manifest["files"].items()}
+    else:
+        checksums = {
+            name: file_sha256(bundle_dir / name)
+            for name in (PICKLE_MODEL_NAME, METADATA_NAME)
+            if (bundle_dir / name).exists()
+        }
+    return hashlib.sha256(json.dumps(checksums, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# =========================
+# READ
+# =========================
+
+def read_manifest(bundle_dir):
+    """
+    The bundle manifest, or None for a legacy pickle-only directory.
+    """
+    path = Path(bundle_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != MANIFEST_FORMAT_VERSION:
+        raise BundleIntegrityError(
+            f"Unsupported manifest format {manifest.get('format_version')} in {path}"
+        )
+    return manifest
+
+
+def verify_file(bundle_dir, name: str, manifest: dict, buffer=None):
+    """
+    Check one bundle file (or an already mapped buffer of it) against
+    the manifest.
+    """
+    entry = manifest["files"].get(name)
+    if entry is None:
+        raise BundleIntegrityError(f"{name} is not listed in the bundle manifest")
+
+    digest = hashlib.sha256(buffer).hexdigest() if buffer is not None else file_sha256(Path(bundle_dir) / name)
+    if digest != entry["sha256"]:
+        raise BundleIntegrityError(f"Checksum mismatch for {Path(bundle_dir) / name}")
+
+
+def verify_bundle(bundle_dir) -> dict:
+    manifest = read_manifest(bundle_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"Bundle manifest not found in {bundle_dir}")
+
+    for name in manifest["files"]:
+        verify_file(bundle_dir, name, manifest)
+    return manifest
+
+
+def load_native_model(bundle_dir, manifest: dict):
+    """
+    Verify model.ubj against the manifest, then let xgboost parse it from
+    the path. xgboost only takes a path or a bytearray, and a bytearray
+    would copy the whole mapped file, so loading is not zero-copy: xgboost
+    reads the file once into its own buffer.
+    """
+    from xgboost import XGBClassifier
+
+    path = Path(bundle_dir) / NATIVE_MODEL_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"Native model file not found at {path}")
+
+    before = _file_identity(path)
+    verify_file(bundle_dir, NATIVE_MODEL_NAME, manifest)
+    model = XGBClassifier()
+    model.load_model(path)
+
+    if _file_identity(path) != before:
+        raise BundleIntegrityError(f"{path} changed while it was being loaded")
+    return model
+
+
+def _file_identity(path: Path) -> tuple:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def load_pickled_model(bundle_dir, manifest: dict = None):
+    """
+    Fallback reader. Verified when the manifest lists model.pkl.
+    """
+    path = Path(bundle_dir) / PICKLE_MODEL_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"Model file not found at {path}")
+
+    if manifest is not None and PICKLE_MODEL_NAME in manifest["files"]:
+        verify_file(bundle_dir, PICKLE_MODEL_NAME, manifest)
+
+    try:
+        return joblib.load(path)
+    except ModuleNotFoundError as e:
+        if "xgboost" in str(e):
+            raise RuntimeError(
+                "Model requires xgboost. Install dependencies from requirements.txt."
+            ) from e
+
+        raise
+
+
+# =========================
+# CLI
+# =========================
+
+_BENCHMARK_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from pathlib import Path
+from ml import model_bundle as b
+bundle = Path(sys.argv[2])
+if sys.argv[1] == "native":
+    b.load_native_model(bundle, b.read_manifest(bundle))
+else:
+    b.load_pickled_model(bundle)
+print(time.perf_counter() - start)
+"""
+
+
+def benchmark(bundle_dir, repeat: int = 20) -> dict:
+    """
+    Cold-start load time per reader, each run in a fresh interpreter with
+    xgboost already imported so only deserialisation (plus verification
+    for the native path) is measured.
+    """
+    snippet = "import xgboost, sklearn.preprocessing\n" + _BENCHMARK_SNIPPET
+    results = {}
+    for reader in ("pickle", "native"):
+        times = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, "-c", snippet, reader, str(bundle_dir)],
+                cwd=BASE_DIR, capture_output=True, text=True, check=True,
+            )
+            times.append(float(out.stdout.strip()) * 1000)
+        results[reader] = {
+            "median_ms": round(statistics.median(times), 2),
+            "min_ms": round(min(times), 2),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage checksummed model bundles.")
+    parser.add_argument("command", choices=["export", "verify", "benchmark"])
+    parser.add_argument("--bundle", default=str(DEFAULT_BUNDLE_DIR))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    bundle_dir = Path(args.bundle)
+
+    if args.command == "export":
+        model = load_pickled_model(bundle_dir)
+        model.save_model(bundle_dir / NATIVE_MODEL_NAME)
+        manifest = write_manifest(bundle_dir)
+        print(f"✅ Wrote {NATIVE_MODEL_NAME} and {MANIFEST_NAME} ({len(manifest['files'])} files) to {bundle_dir}")
+    elif args.command == "verify":
+        manifest = verify_bundle(bundle_dir)
+        print(f"✅ {len(manifest['files'])} files verified in {bundle_dir}")
+    else:
+        for reader, stats in benchmark(bundle_dir, args.repeat).items():
+            print(f"{reader:>7}: median {stats['median_ms']} ms, min {stats['min_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
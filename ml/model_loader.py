@@ -1,11 +1,36 @@
 """
 MODEL LOADER - Strict ML Integrity Layer
+
+When model/manifest.json exists the model directory is treated as a
+checksummed bundle (see ml.model_bundle): the native model.ubj, the
+encoder and the metadata are verified before use. model.pkl remains the
+fallback reader.
 """
 
 import json
+import logging
+import os
+import threading
 from pathlib import Path
 
 import joblib
+import numpy as np
+
+from ml.feature_pipeline import compile_feature_pipeline
+from ml.thread_config import configure_model_threads
+from ml.model_bundle import (
+    BundleIntegrityError,
+    ENCODER_NAME,
+    METADATA_NAME,
+    NATIVE_MODEL_NAME,
+    bundle_fingerprint,
+    load_native_model,
+    load_pickled_model,
+    read_manifest,
+    verify_file,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # =========================
@@ -14,9 +39,10 @@ import joblib
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 
-MODEL_PATH = BASE_DIR / "model" / "model.pkl"
-ENCODER_PATH = BASE_DIR / "model" / "label_encoder.pkl"
-METADATA_PATH = BASE_DIR / "model" / "model_metadata.json"
+# SDLC_MODEL_DIR serves an alternative bundle, e.g. model/compact.
+MODEL_DIR = Path(os.getenv("SDLC_MODEL_DIR", BASE_DIR / "model"))
+ENCODER_PATH = MODEL_DIR / ENCODER_NAME
+METADATA_PATH = MODEL_DIR / METADATA_NAME
 
 
 # =========================
@@ -26,6 +52,37 @@ METADATA_PATH = BASE_DIR / "model" / "model_metadata.json"
 _model = None
 _label_encoder = None
 _metadata = None
+_feature_pipeline = None
+_model_format = None
+_model_fingerprint = None
+
+# Re-entrant: load_model() loads metadata and encoder while holding it.
+_load_lock = threading.RLock()
+
+
+# =========================
+# BUNDLE MANIFEST
+# =========================
+
+def _manifest():
+    return read_manifest(MODEL_DIR)
+
+
+def _load_bundle_model(bundle_dir, manifest):
+    """
+    (model, format) from a bundle directory: native when a manifest lists
+    it, otherwise the pickle. A checksum failure is never masked by the
+    fallback.
+    """
+    if manifest is not None and NATIVE_MODEL_NAME in manifest["files"]:
+        try:
+            return load_native_model(bundle_dir, manifest), "ubj"
+        except BundleIntegrityError:
+            raise
+        except Exception as error:
+            logger.warning("Native model load failed in %s, falling back to pickle: %s", bundle_dir, error)
+
+    return load_pickled_model(bundle_dir, manifest), "pickle"
 
 
 # =========================
@@ -36,13 +93,19 @@ def load_metadata():
     global _metadata
 
     if _metadata is None:
-        if not METADATA_PATH.exists():
-            raise FileNotFoundError(
-                f"Metadata file not found at {METADATA_PATH}"
-            )
+        with _load_lock:
+            if _metadata is None:
+                if not METADATA_PATH.exists():
+                    raise FileNotFoundError(
+                        f"Metadata file not found at {METADATA_PATH}"
+                    )
+
+                manifest = _manifest()
+                if manifest is not None:
+                    verify_file(MODEL_DIR, METADATA_NAME, manifest)
 
-        with open(METADATA_PATH, "r", encoding="utf-8") as f:
-            _metadata = json.load(f)
+                with open(METADATA_PATH, "r", encoding="utf-8") as f:
+                    _metadata = json.load(f)
 
     return _metadata
 
@@ -52,33 +115,56 @@ def load_metadata():
 # =========================
 
 def load_model():
-    global _model
+    global _model, _feature_pipeline, _model_format, _model_fingerprint
 
     if _model is None:
-        if not MODEL_PATH.exists():
-            raise FileNotFoundError(
-                f"Model file not found at {MODEL_PATH}"
-            )
+        with _load_lock:
+            if _model is None:
+                manifest = _manifest()
+                model, model_format = _load_bundle_model(MODEL_DIR, manifest)
+
+                metadata = load_metadata()
+
+                # STRICT CLASS COUNT CHECK
+                if len(metadata["class_labels"]) != model.n_classes_:
+                    raise ValueError(
+                        "Class label count mismatch with trained model"
+                    )
+
+                # STRICT SCHEMA CHECK - compiled once, fails fast on mismatch
+                validate_model_integrity()
+                _feature_pipeline = compile_feature_pipeline(get_feature_order(), model)
+                _model_format = model_format
+                _model_fingerprint = bundle_fingerprint(MODEL_DIR, manifest)
+                # Published last so lock-free readers never see a half-initialised model.
+                _model = configure_model_threads(model)
 
-        try:
-            _model = joblib.load(MODEL_PATH)
-        except ModuleNotFoundError as e:
-            if "xgboost" in str(e):
-                raise RuntimeError(
-                    "Model requires xgboost. Install dependencies from requirements.txt."
-                ) from e
+    return _model
 
-            raise
 
-        metadata = load_metadata()
+def get_model_format():
+    """
+    "ubj" or "pickle" once the model is loaded, else None.
+    """
+    return _model_format
 
-        # STRICT CLASS COUNT CHECK
-        if len(metadata["class_labels"]) != _model.n_classes_:
-            raise ValueError(
-                "Class label count mismatch with trained model"
-            )
 
-    return _model
+def get_model_fingerprint():
+    """
+    Content hash of the loaded bundle (see ml.model_bundle.bundle_fingerprint).
+    model_version alone does not change between retrains.
+    """
+    load_model()
+    return _model_fingerprint
+
+
+# =========================
+# FEATURE PIPELINE
+# =========================
+
+def get_feature_pipeline():
+    load_model()
+    return _feature_pipeline
 
 
 # =========================
@@ -89,12 +175,18 @@ def load_encoder():
     global _label_encoder
 
     if _label_encoder is None:
-        if not ENCODER_PATH.exists():
-            raise FileNotFoundError(
-                f"Encoder file not found at {ENCODER_PATH}"
-            )
+        with _load_lock:
+            if _label_encoder is None:
+                if not ENCODER_PATH.exists():
+                    raise FileNotFoundError(
+                        f"Encoder file not found at {ENCODER_PATH}"
+                    )
+
+                manifest = _manifest()
+                if manifest is not None:
+                    verify_file(MODEL_DIR, ENCODER_NAME, manifest)
 
-        _label_encoder = joblib.load(ENCODER_PATH)
+                _label_encoder = joblib.load(ENCODER_PATH)
 
     return _label_encoder
 
@@ -136,16 +228,70 @@ def get_feature_order():
 # PREDICT
 # =========================
 
-def predict_proba(feature_vector: list):
-    if len(feature_vector) != len(get_feature_order()):
+def predict_proba(feature_vector):
+    # Schema and integrity are validated once in load_model().
+    model = load_model()
+    feature_vector = np.asarray(feature_vector, dtype=np.float64)
+
+    if feature_vector.shape != (_feature_pipeline.n_features,):
         raise ValueError("Feature vector length mismatch")
 
-    validate_model_integrity()
+    return model.predict_proba(feature_vector.reshape(1, -1))[0]
 
-    model = load_model()
-    probabilities = model.predict_proba([feature_vector])[0]
 
-    return probabilities
+# =========================
+# LOAD CANDIDATE BUNDLE
+# =========================
+
+def load_model_bundle(bundle_dir):
+    """
+    Load a self-contained model bundle (model.ubj or model.pkl, plus
+    model_metadata.json and, when present, label_encoder.pkl) from another
+    directory, e.g. a retrained candidate. Verified when it carries a
+    manifest. Not cached.
+    """
+    bundle_dir = Path(bundle_dir)
+    metadata_path = bundle_dir / METADATA_NAME
+
+    if not metadata_path.exists():
+        raise FileNotFoundError(f"Bundle file not found at {metadata_path}")
+
+    manifest = read_manifest(bundle_dir)
+    if manifest is not None:
+        verify_file(bundle_dir, METADATA_NAME, manifest)
+
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    model, model_format = _load_bundle_model(bundle_dir, manifest)
+    configure_model_threads(model)
+
+    if len(metadata["class_labels"]) != model.n_classes_:
+        raise ValueError(
+            f"Class label count mismatch with trained model in {bundle_dir}"
+        )
+
+    if metadata["feature_count"] != len(metadata["feature_order"]):
+        raise ValueError(f"Feature count mismatch in metadata of {bundle_dir}")
+
+    label_encoder = None
+    encoder_path = bundle_dir / ENCODER_NAME
+    if encoder_path.exists():
+        if manifest is not None:
+            verify_file(bundle_dir, ENCODER_NAME, manifest)
+        label_encoder = joblib.load(encoder_path)
+        if list(label_encoder.classes_) != metadata["class_labels"]:
+            raise ValueError(f"Class label mismatch between encoder and metadata in {bundle_dir}")
+
+    return {
+        "model": model,
+        "metadata": metadata,
+        "label_encoder": label_encoder,
+        "pipeline": compile_feature_pipeline(metadata["feature_order"], model),
+        "path": str(bundle_dir),
+        "format": model_format,
+        "fingerprint": bundle_fingerprint(bundle_dir, manifest),
+    }
 
 
 # =========================
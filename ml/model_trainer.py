@@ -1,14 +1,63 @@
+"""
+TRAINING PIPELINE - Staged, content-addressed, resumable
+
+    python ml/model_trainer.py [--data PATH] [--force] [--no-cache]
+
+Stages: ingest → split → encode → fit → evaluate → stability → export →
+distill → export_compact.
+Each stage output is cached under model/.cache/ keyed by a SHA-256 of the
+stage's source code, the source of the helpers and modules it depends on
+(STAGE_DEPENDENCIES), the numpy / pandas / scikit-learn / xgboost versions,
+its parameters and the keys of its upstream stages (the dataset stage is
+keyed by the file's content hash). Unchanged stages
+are loaded instead of recomputed, and because every completed stage is
+persisted atomically an interrupted run resumes from the last one.
+
+The distill stage trains a compact student on the full model's soft
+probabilities (training split + synthetic projects); the export_compact
+stage writes it to model/compact/ as an alternative bundle only when its
+top-1 agreement with the full model on the test split clears
+--distill-min-agreement and its test accuracy is within
+--distill-max-accuracy-drop of the full model's.
+Serve it with SDLC_MODEL_DIR=model/compact or shadow it via
+SDLC_SHADOW_BUNDLES.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
 import os
+import shutil
+import sys
+import time
 import warnings
 import joblib
 import numpy as np
 import pandas as pd
+import sklearn
+import xgboost
 
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 from xgboost import XGBClassifier
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ml import feature_config
+from ml import drift_monitor, feature_pipeline, model_bundle
+from ml.drift_monitor import build_drift_reference
+from ml.feature_pipeline import RAW_INPUT_FIELDS, FeaturePipeline
+from ml.model_bundle import (
+    ENCODER_NAME,
+    MANIFEST_NAME,
+    METADATA_NAME,
+    NATIVE_MODEL_NAME,
+    PICKLE_MODEL_NAME,
+    write_bundle,
+)
+
 warnings.filterwarnings("ignore")
 np.random.seed(42)
 
@@ -18,145 +67,586 @@ np.random.seed(42)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, "data", "sdlc_dataset_1800.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "model")
-
-os.makedirs(MODEL_DIR, exist_ok=True)
+CACHE_DIR = os.path.join(MODEL_DIR, ".cache")
 
 # --------------------------------------------------
-# 1️⃣ Load Dataset
+# 🔹 HYPERPARAMETERS
 # --------------------------------------------------
-df = pd.read_csv(DATA_PATH)
+SPLIT_PARAMS = {"test_size": 0.2, "random_state": 42}
+
+MODEL_PARAMS = {
+    "objective": "multi:softprob",
+    "n_estimators": 150,
+    "max_depth": 5,
+    "learning_rate": 0.1,
+    "subsample": 0.9,
+    "colsample_bytree": 0.9,
+    "random_state": 42,
+    "eval_metric": "mlogloss",
+}
+
+STABILITY_SEEDS = [42, 123, 456]
+
+MODEL_VERSION = "ml_v1"
+
+# Compact student distilled from the full model (soft-label cross-entropy).
+# 20 rounds x depth 4 is 100 trees against the teacher's 750. Agreement
+# plateaus around 94-95% from here up to students as large as the teacher,
+# so extra capacity buys little.
+DISTILL_PARAMS = {
+    "objective": "multi:softprob",
+    "n_estimators": 20,
+    "max_depth": 4,
+    "learning_rate": 0.4,
+    "random_state": 42,
+    "eval_metric": "mlogloss",
+}
+DISTILL_SYNTHETIC_SAMPLES = 50_000
+DISTILL_HOLDOUT_SAMPLES = 5_000
+# Gated on the real test split; the synthetic holdout is reported only.
+DISTILL_MIN_TOP1_AGREEMENT = 0.95
+# One project of the 60-project test split.
+DISTILL_MAX_ACCURACY_DROP = 0.02
+COMPACT_MODEL_SUBDIR = "compact"
+
 
 # --------------------------------------------------
-# 2️⃣ Integrity Check
+# 🔹 STAGE CACHE
 # --------------------------------------------------
-assert df.groupby("project_id")["is_best"].sum().eq(1).all(), \
-    "Integrity error: More than one optimal SDLC per project!"
+def _sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    SHA-256 of a file's content, memoised on (size, mtime) so large
+    datasets are only re-hashed when they change on disk.
+    """
+    stat = os.stat(path)
+    memo_path = os.path.join(cache_dir, "file_digests.json")
+    memo_key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    memo = {}
+    if os.path.exists(memo_path):
+        with open(memo_path, "r", encoding="utf-8") as f:
+            memo = json.load(f)
+
+    if memo_key not in memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        memo[memo_key] = digest.hexdigest()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(memo_path, "w", encoding="utf-8") as f:
+            json.dump(memo, f, indent=2)
+
+    return memo[memo_key]
+
+
+def _source_digest(obj) -> str:
+    return _sha256_bytes(inspect.getsource(obj).encode())
+
+
+# Library versions that change what a stage computes or serialises.
+LIBRARY_VERSIONS = {
+    "numpy": np.__version__,
+    "pandas": pd.__version__,
+    "scikit-learn": sklearn.__version__,
+    "xgboost": xgboost.__version__,
+}
+
+
+class StageCache:
+    """
+    Content-addressed store for stage outputs.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, enabled: bool = True, force: bool = False):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.force = force
+        self.summary = []
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def stage_key(name: str, fn, params: dict, upstream: list) -> str:
+        payload = {
+            "stage": name,
+            "code": _source_digest(fn),
+            "depends": [_source_digest(dep) for dep in STAGE_DEPENDENCIES.get(name, ())],
+            "libraries": LIBRARY_VERSIONS,
+            "params": params,
+            "upstream": upstream,
+        }
+        return _sha256_bytes(json.dumps(payload, sort_keys=True, default=str).encode())
+
+    def run(self, name: str, fn, params: dict = None, upstream: list = None, args: tuple = ()):
+        """
+        Return (output, key) for a stage, loading it from cache when the
+        key is unchanged. Outputs are written atomically on completion.
+        """
+        params = params or {}
+        upstream = upstream or []
+        key = self.stage_key(name, fn, params, upstream)
+        path = os.path.join(self.cache_dir, f"{name}-{key[:16]}.joblib")
+
+        if self.enabled and not self.force and os.path.exists(path):
+            self.summary.append((name, "cached", 0.0))
+            return joblib.load(path), key
+
+        start = time.perf_counter()
+        output = fn(*args, **params)
+        elapsed = time.perf_counter() - start
+
+        if self.enabled:
+            tmp_path = f"{path}.tmp"
+            joblib.dump(output, tmp_path)
+            os.replace(tmp_path, path)
+
+        self.summary.append((name, "ran", elapsed))
+        return output, key
 
-print("✅ Integrity check passed.")
 
 # --------------------------------------------------
-# 3️⃣ Project-Level Aggregation
+# 1️⃣ Ingest + Integrity Check + Project-Level Aggregation
 # --------------------------------------------------
-project_best = df[df["is_best"] == 1].copy()
-project_best = project_best.set_index("project_id")
-project_best["optimal_sdlc"] = project_best["sdlc_type"]
+def ingest(data_path: str) -> dict:
+    df = pd.read_csv(data_path)
+
+    assert df.groupby("project_id")["is_best"].sum().eq(1).all(), \
+        "Integrity error: More than one optimal SDLC per project!"
+
+    project_best = df[df["is_best"] == 1].copy()
+    project_best = project_best.set_index("project_id")
+    project_best["optimal_sdlc"] = project_best["sdlc_type"]
+
+    # Explicit feature selection
+    features = [
+        col for col in df.columns
+        if col not in ["project_id", "sdlc_type", "suitability_score", "is_best"]
+    ]
+
+    return {
+        "X": project_best[features],
+        "y": project_best["optimal_sdlc"],
+        "features": features,
+    }
 
-print(f"✅ {len(project_best)} unique projects detected.")
 
 # --------------------------------------------------
-# 4️⃣ Explicit Feature Selection
+# 2️⃣ Stratified Project Split
 # --------------------------------------------------
-FEATURES = [
-    col for col in df.columns
-    if col not in ["project_id", "sdlc_type", "suitability_score", "is_best"]
-]
+def split(ingested: dict, test_size: float, random_state: int) -> dict:
+    X_train, X_test, y_train, y_test = train_test_split(
+        ingested["X"],
+        ingested["y"],
+        test_size=test_size,
+        random_state=random_state,
+        stratify=ingested["y"]
+    )
+    return {"X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test}
 
-print(f"Using {len(FEATURES)} features.")
 
-X = project_best[FEATURES]
-y = project_best["optimal_sdlc"]
+# --------------------------------------------------
+# 3️⃣ Encode Labels
+# --------------------------------------------------
+def encode(splits: dict) -> dict:
+    label_enc = LabelEncoder()
+    return {
+        "label_encoder": label_enc,
+        "y_train_enc": label_enc.fit_transform(splits["y_train"]),
+        "y_test_enc": label_enc.transform(splits["y_test"]),
+    }
+
 
 # --------------------------------------------------
-# 5️⃣ Stratified Project Split
+# 4️⃣ Train Multi-Class XGBoost
 # --------------------------------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X,
-    y,
-    test_size=0.2,
-    random_state=42,
-    stratify=y
-)
+def fit(splits: dict, encoded: dict, **model_params) -> XGBClassifier:
+    model = XGBClassifier(
+        num_class=len(encoded["label_encoder"].classes_),
+        **model_params
+    )
+
+    model.fit(
+        splits["X_train"],
+        encoded["y_train_enc"],
+        eval_set=[(splits["X_test"], encoded["y_test_enc"])],
+        verbose=False
+    )
+    return model
 
-print(f"✅ Train: {len(X_train)} | Test: {len(X_test)}")
 
 # --------------------------------------------------
-# 6️⃣ Encode Labels
+# 5️⃣ Evaluation (Project-Level)
 # --------------------------------------------------
-label_enc = LabelEncoder()
-y_train_enc = label_enc.fit_transform(y_train)
-y_test_enc = label_enc.transform(y_test)
+def evaluate(model: XGBClassifier, splits: dict, encoded: dict) -> dict:
+    y_test_enc = encoded["y_test_enc"]
+    classes = encoded["label_encoder"].classes_
+
+    proba = model.predict_proba(splits["X_test"])
+    pred_idx = np.argmax(proba, axis=1)
+
+    top1_acc = (pred_idx == y_test_enc).mean()
+
+    # Top-2 Accuracy
+    top2 = np.argsort(proba, axis=1)[:, -2:]
+    top2_acc = np.mean([y_test_enc[i] in top2[i] for i in range(len(y_test_enc))])
+
+    return {
+        "top1_accuracy": float(top1_acc),
+        "top2_accuracy": float(top2_acc),
+        "classification_report": classification_report(y_test_enc, pred_idx, target_names=classes),
+        "confusion_matrix": pd.DataFrame(
+            confusion_matrix(y_test_enc, pred_idx), index=classes, columns=classes
+        ),
+    }
 
-print(f"Classes: {list(label_enc.classes_)}")
 
 # --------------------------------------------------
-# 7️⃣ Train Multi-Class XGBoost
+# 6️⃣ Stability Test (Consistent Hyperparameters)
 # --------------------------------------------------
-model = XGBClassifier(
-    objective="multi:softprob",
-    num_class=len(label_enc.classes_),
-    n_estimators=150,
-    max_depth=5,
-    learning_rate=0.1,
-    subsample=0.9,
-    colsample_bytree=0.9,
-    random_state=42,
-    eval_metric="mlogloss"
-)
+def stability(splits: dict, encoded: dict, seeds: list, **model_params) -> list:
+    scores = []
 
-model.fit(
-    X_train,
-    y_train_enc,
-    eval_set=[(X_test, y_test_enc)],
-    verbose=False
-)
+    for seed in seeds:
+        m = XGBClassifier(
+            num_class=len(encoded["label_encoder"].classes_),
+            **{**model_params, "random_state": seed}
+        )
+        m.fit(splits["X_train"], encoded["y_train_enc"])
+        p = m.predict_proba(splits["X_test"]).argmax(axis=1)
+        scores.append(float((p == encoded["y_test_enc"]).mean()))
+
+    return scores
 
-print("✅ Model training complete.")
 
 # --------------------------------------------------
-# 8️⃣ Evaluation (Project-Level)
+# 7️⃣ Save Bundle (native model + pickle fallback + manifest) + Drift Reference
 # --------------------------------------------------
-proba = model.predict_proba(X_test)
-pred_idx = np.argmax(proba, axis=1)
+def export(model: XGBClassifier, splits: dict, encoded: dict, model_dir: str, model_version: str) -> dict:
+    features = list(splits["X_train"].columns)
+    metadata = {
+        "model_version": model_version,
+        "feature_count": len(features),
+        "feature_order": features,
+        "class_labels": list(encoded["label_encoder"].classes_),
+    }
 
-top1_acc = (pred_idx == y_test_enc).mean()
+    # Same file names ml.model_loader reads: model.ubj / model.pkl, label_encoder.pkl,
+    # model_metadata.json, checksummed by manifest.json.
+    write_bundle(model, encoded["label_encoder"], metadata, model_dir)
 
-# Top-2 Accuracy
-top2 = np.argsort(proba, axis=1)[:, -2:]
-top2_acc = np.mean([y_test_enc[i] in top2[i] for i in range(len(y_test_enc))])
+    paths = {
+        "model": os.path.join(model_dir, NATIVE_MODEL_NAME),
+        "model_pickle": os.path.join(model_dir, PICKLE_MODEL_NAME),
+        "encoder": os.path.join(model_dir, ENCODER_NAME),
+        "metadata": os.path.join(model_dir, METADATA_NAME),
+        "manifest": os.path.join(model_dir, MANIFEST_NAME),
+        "drift_reference": os.path.join(model_dir, "drift_reference.json"),
+    }
 
-print(f"\n🎯 PROJECT TOP-1 ACCURACY: {top1_acc:.2%}")
-print(f"🎯 PROJECT TOP-2 ACCURACY: {top2_acc:.2%}")
+    # Drift reference statistics over the training split, read by ml.drift_monitor.
+    with open(paths["drift_reference"], "w", encoding="utf-8") as f:
+        json.dump(build_drift_reference(splits["X_train"], splits["y_train"], model_version=model_version), f, indent=2)
 
-print("\nClassification Report:")
-print(classification_report(y_test_enc, pred_idx, target_names=label_enc.classes_))
+    return paths
 
-print("\nConfusion Matrix:")
-cm = confusion_matrix(y_test_enc, pred_idx)
-print(pd.DataFrame(cm, index=label_enc.classes_, columns=label_enc.classes_))
 
 # --------------------------------------------------
-# 9️⃣ Stability Test (Consistent Hyperparameters)
+# 8️⃣ Distil Compact Student (soft labels, train + synthetic)
 # --------------------------------------------------
-seeds = [42, 123, 456]
-scores = []
+def _synthetic_features(features: list, n: int, seed: int) -> np.ndarray:
+    """
+    Engineered vectors from uniformly sampled raw inputs, built with the
+    serving feature pipeline so they follow its feature relationships.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {name: rng.integers(1, 6, n).astype(float) for name in RAW_INPUT_FIELDS}
+    for name in ("requirement_change_frequency", "decision_making_speed", "domain_criticality", "risk_tolerance_level"):
+        columns[name] = rng.choice([1.0, 3.0, 5.0], n)
+    columns["project_budget"] = np.exp(rng.uniform(np.log(20_000), np.log(5_000_000), n))
+    columns["project_duration_months"] = rng.integers(1, 61, n).astype(float)
+    columns["team_size"] = rng.integers(1, 51, n).astype(float)
+    columns["number_of_integrations"] = rng.integers(0, 21, n).astype(float)
+    return FeaturePipeline(features).transform_batch(columns)
+
+
+def _median_latency_ms(fn, rows: np.ndarray, repeat: int = 200) -> float:
+    times = []
+    for i in range(repeat):
+        row = rows[i % len(rows)][None, :]
+        start = time.perf_counter()
+        fn(row)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def _agreement(teacher_proba: np.ndarray, student_proba: np.ndarray) -> dict:
+    teacher_top = teacher_proba.argmax(axis=1)
+    student_top2 = np.argsort(student_proba, axis=1)[:, -2:]
+    return {
+        "top1": float((student_proba.argmax(axis=1) == teacher_top).mean()),
+        "top2": float((student_top2 == teacher_top[:, None]).any(axis=1).mean()),
+    }
+
+
+def distill(model: XGBClassifier, splits: dict, encoded: dict, synthetic_samples: int, holdout_samples: int, **student_params) -> dict:
+    features = list(splits["X_train"].columns)
+    n_classes = len(encoded["label_encoder"].classes_)
 
-for seed in seeds:
-    m = XGBClassifier(
-        objective="multi:softprob",
-        num_class=len(label_enc.classes_),
-        n_estimators=150,
-        max_depth=5,
-        learning_rate=0.1,
-        subsample=0.9,
-        colsample_bytree=0.9,
-        random_state=seed,
-        eval_metric="mlogloss"
+    transfer = np.vstack([
+        splits["X_train"].to_numpy(dtype=np.float64),
+        _synthetic_features(features, synthetic_samples, seed=1),
+    ])
+    soft = model.predict_proba(transfer)
+
+    # Soft-label cross-entropy: every row once per class, weighted by the
+    # teacher's probability for that class.
+    student = XGBClassifier(num_class=n_classes, **student_params)
+    student.fit(
+        pd.DataFrame(np.repeat(transfer, n_classes, axis=0), columns=features),
+        np.tile(np.arange(n_classes), len(transfer)),
+        sample_weight=soft.ravel(),
+        verbose=False,
     )
-    m.fit(X_train, y_train_enc)
-    p = m.predict_proba(X_test).argmax(axis=1)
-    scores.append((p == y_test_enc).mean())
 
-print(f"\nStability: {np.mean(scores):.2%} ± {np.std(scores):.3f}")
-print("Seed Scores:", [f"{s:.2%}" for s in scores])
+    X_test = splits["X_test"].to_numpy(dtype=np.float64)
+    holdout = _synthetic_features(features, holdout_samples, seed=2)
+    pooled = np.vstack([X_test, holdout])
+    y_test_enc = encoded["y_test_enc"]
+
+    def leaves(m):
+        return int((m.get_booster().trees_to_dataframe()["Feature"] == "Leaf").sum())
+
+    report = {
+        "teacher_trees": len(model.get_booster().get_dump()),
+        "student_trees": len(student.get_booster().get_dump()),
+        "teacher_leaves": leaves(model),
+        "student_leaves": leaves(student),
+        "agreement": _agreement(model.predict_proba(pooled), student.predict_proba(pooled)),
+        "agreement_test": _agreement(model.predict_proba(X_test), student.predict_proba(X_test)),
+        "agreement_synthetic": _agreement(model.predict_proba(holdout), student.predict_proba(holdout)),
+        "teacher_top1_accuracy": float((model.predict_proba(X_test).argmax(axis=1) == y_test_enc).mean()),
+        "student_top1_accuracy": float((student.predict_proba(X_test).argmax(axis=1) == y_test_enc).mean()),
+        "teacher_latency_ms": _median_latency_ms(model.predict_proba, holdout),
+        "student_latency_ms": _median_latency_ms(student.predict_proba, holdout),
+    }
+
+    try:
+        import shap
+
+        teacher_shap, student_shap = shap.TreeExplainer(model), shap.TreeExplainer(student)
+        report["teacher_shap_ms"] = _median_latency_ms(teacher_shap.shap_values, holdout, repeat=50)
+        report["student_shap_ms"] = _median_latency_ms(student_shap.shap_values, holdout, repeat=50)
+    except ImportError:
+        pass
+
+    return {"student": student, "report": report}
+
+
+def export_compact(
+    distilled: dict,
+    encoded: dict,
+    features: list,
+    model_dir: str,
+    model_version: str,
+    min_agreement: float,
+    max_accuracy_drop: float,
+) -> dict:
+    """
+    Write the student as an alternative bundle under model/compact/ only
+    when its top-1 agreement with the full model on the test split clears
+    min_agreement and its test accuracy is within max_accuracy_drop of the
+    full model's. Otherwise nothing is written and a compact bundle left by
+    an earlier run is removed. Returns the written paths.
+    """
+    report = distilled["report"]
+    compact_dir = os.path.join(model_dir, COMPACT_MODEL_SUBDIR)
+
+    accepted = (
+        report["agreement_test"]["top1"] >= min_agreement
+        and report["teacher_top1_accuracy"] - report["student_top1_accuracy"] <= max_accuracy_drop
+    )
+    if not accepted:
+        if os.path.exists(os.path.join(compact_dir, MANIFEST_NAME)):
+            shutil.rmtree(compact_dir)
+        return {}
+
+    metadata = {
+        "model_version": f"{model_version}_compact",
+        "feature_count": len(features),
+        "feature_order": features,
+        "class_labels": list(encoded["label_encoder"].classes_),
+        "distilled_from": model_version,
+        "distillation": report,
+    }
+    write_bundle(distilled["student"], encoded["label_encoder"], metadata, compact_dir)
+    return {
+        "compact_dir": compact_dir,
+        "manifest": os.path.join(compact_dir, MANIFEST_NAME),
+        "metadata": os.path.join(compact_dir, METADATA_NAME),
+    }
+
 
 # --------------------------------------------------
-# 🔟 Save Model + Encoder
+# 🔹 STAGE DEPENDENCIES
 # --------------------------------------------------
-model_path = os.path.join(MODEL_DIR, "xgb_sdlc_model.pkl")
-encoder_path = os.path.join(MODEL_DIR, "label_encoder.pkl")
+# Helpers and modules whose source is part of a stage's cache key, beyond
+# the stage function itself.
+STAGE_DEPENDENCIES = {
+    "export": (model_bundle, drift_monitor),
+    "distill": (_synthetic_features, _median_latency_ms, _agreement, feature_pipeline, feature_config),
+    "export_compact": (model_bundle,),
+}
+
+
+# --------------------------------------------------
+# 🔹 PIPELINE
+# --------------------------------------------------
+def run_pipeline(
+    data_path: str = DATA_PATH,
+    model_dir: str = MODEL_DIR,
+    cache: StageCache = None,
+    min_agreement: float = DISTILL_MIN_TOP1_AGREEMENT,
+    max_accuracy_drop: float = DISTILL_MAX_ACCURACY_DROP,
+) -> dict:
+    cache = cache or StageCache()
+    os.makedirs(model_dir, exist_ok=True)
+
+    data_key = file_digest(data_path, cache.cache_dir)
+
+    ingested, ingest_key = cache.run(
+        "ingest", ingest, upstream=[data_key], args=(data_path,)
+    )
+    print("✅ Integrity check passed.")
+    print(f"✅ {len(ingested['X'])} unique projects detected.")
+    print(f"Using {len(ingested['features'])} features.")
+
+    splits, split_key = cache.run(
+        "split", split, params=SPLIT_PARAMS, upstream=[ingest_key], args=(ingested,)
+    )
+    print(f"✅ Train: {len(splits['X_train'])} | Test: {len(splits['X_test'])}")
+
+    encoded, encode_key = cache.run(
+        "encode", encode, upstream=[split_key], args=(splits,)
+    )
+    print(f"Classes: {list(encoded['label_encoder'].classes_)}")
+
+    model, fit_key = cache.run(
+        "fit", fit, params=MODEL_PARAMS, upstream=[split_key, encode_key], args=(splits, encoded)
+    )
+    print("✅ Model training complete.")
+
+    metrics, _ = cache.run(
+        "evaluate", evaluate, upstream=[fit_key, split_key, encode_key], args=(model, splits, encoded)
+    )
+    print(f"\n🎯 PROJECT TOP-1 ACCURACY: {metrics['top1_accuracy']:.2%}")
+    print(f"🎯 PROJECT TOP-2 ACCURACY: {metrics['top2_accuracy']:.2%}")
+    print("\nClassification Report:")
+    print(metrics["classification_report"])
+    print("\nConfusion Matrix:")
+    print(metrics["confusion_matrix"])
+
+    scores, _ = cache.run(
+        "stability", stability, params={**MODEL_PARAMS, "seeds": STABILITY_SEEDS},
+        upstream=[split_key, encode_key], args=(splits, encoded)
+    )
+    print(f"\nStability: {np.mean(scores):.2%} ± {np.std(scores):.3f}")
+    print("Seed Scores:", [f"{s:.2%}" for s in scores])
+
+    export_params = {"model_dir": model_dir, "model_version": MODEL_VERSION}
+    export_key = StageCache.stage_key("export", export, export_params, [fit_key, split_key, encode_key])
+    exported = _cached_artifacts(cache, "export", export_key)
+    if exported is None:
+        exported, _ = cache.run(
+            "export", export, params=export_params,
+            upstream=[fit_key, split_key, encode_key], args=(model, splits, encoded)
+        )
+    print(f"\n✅ Model bundle and drift reference saved to {model_dir}")
+
+    distilled, distill_key = cache.run(
+        "distill", distill,
+        params={**DISTILL_PARAMS, "synthetic_samples": DISTILL_SYNTHETIC_SAMPLES, "holdout_samples": DISTILL_HOLDOUT_SAMPLES},
+        upstream=[fit_key, split_key, encode_key], args=(model, splits, encoded)
+    )
+    report = distilled["report"]
+    print(f"\n🧪 Distilled student: {report['student_trees']} trees / {report['student_leaves']} leaves "
+          f"(teacher {report['teacher_trees']} / {report['teacher_leaves']})")
+    print(f"   Agreement top-1 / top-2 — overall: {report['agreement']['top1']:.2%} / {report['agreement']['top2']:.2%}")
+    print(f"   By source — test: {report['agreement_test']['top1']:.2%} / {report['agreement_test']['top2']:.2%}"
+          f", synthetic: {report['agreement_synthetic']['top1']:.2%} / {report['agreement_synthetic']['top2']:.2%}")
+    print(f"   Accuracy top-1 — teacher: {report['teacher_top1_accuracy']:.2%}, student: {report['student_top1_accuracy']:.2%}")
+    print(f"   Latency (1 row) — predict: {report['teacher_latency_ms']:.3f} → {report['student_latency_ms']:.3f} ms"
+          + (f", SHAP: {report['teacher_shap_ms']:.3f} → {report['student_shap_ms']:.3f} ms" if "student_shap_ms" in report else ""))
+
+    compact_params = {
+        "model_dir": model_dir,
+        "model_version": MODEL_VERSION,
+        "min_agreement": min_agreement,
+        "max_accuracy_drop": max_accuracy_drop,
+    }
+    compact_upstream = [distill_key, encode_key, split_key]
+    compact_key = StageCache.stage_key("export_compact", export_compact, compact_params, compact_upstream)
+    compact = _cached_artifacts(cache, "export_compact", compact_key)
+    if compact is None:
+        compact, _ = cache.run(
+            "export_compact", export_compact, params=compact_params, upstream=compact_upstream,
+            args=(distilled, encoded, list(splits["X_train"].columns))
+        )
+    compact_dir = compact.get("compact_dir")
+    if compact_dir:
+        print(f"✅ Compact bundle saved to {compact_dir}")
+    else:
+        print(f"⚠️  Compact bundle not emitted: test agreement {report['agreement_test']['top1']:.2%} "
+              f"(min {min_agreement:.0%}), accuracy drop "
+              f"{report['teacher_top1_accuracy'] - report['student_top1_accuracy']:.2%} (max {max_accuracy_drop:.0%})")
+
+    return {"metrics": metrics, "stability": scores, "artifacts": exported, "distillation": report, "compact_bundle": compact_dir}
+
+
+def _cached_artifacts(cache: StageCache, name: str, key: str):
+    """
+    Export stages write files rather than returning data, so they are only
+    skipped when their cached record exists and every artifact is still on
+    disk.
+    """
+    record = os.path.join(cache.cache_dir, f"{name}-{key[:16]}.joblib")
+    if not cache.enabled or cache.force or not os.path.exists(record):
+        return None
+
+    paths = joblib.load(record)
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+
+    cache.summary.append((name, "cached", 0.0))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the SDLC recommendation model.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--force", action="store_true", help="Recompute every stage.")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the stage cache.")
+    parser.add_argument("--distill-min-agreement", type=float, default=DISTILL_MIN_TOP1_AGREEMENT,
+                        help="Top-1 test-split agreement the compact student needs before its bundle is written.")
+    parser.add_argument("--distill-max-accuracy-drop", type=float, default=DISTILL_MAX_ACCURACY_DROP,
+                        help="Largest test accuracy drop from the full model the compact student may have.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    cache = StageCache(args.cache_dir, enabled=not args.no_cache, force=args.force)
+    run_pipeline(args.data, args.model_dir, cache, args.distill_min_agreement, args.distill_max_accuracy_drop)
+
+    print("\nStages:", ", ".join(f"{name}={state}" + (f" ({t:.2f}s)" if state == "ran" else "")
+                                 for name, state, t in cache.summary))
+    print(f"⏱  Total: {time.perf_counter() - start:.2f}s")
+    print("📦 TRAINING PIPELINE VERIFIED & PRODUCTION READY.")
 
-joblib.dump(model, model_path)
-joblib.dump(label_enc, encoder_path)
 
-print("\n✅ Model and encoder saved to /model folder.")
-print("📦 TRAINING PIPELINE VERIFIED & PRODUCTION READY.")
+if __name__ == "__main__":
+    main()
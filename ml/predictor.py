@@ -1,27 +1,48 @@
+import copy
 import logging
 import os
+import threading
 import time
 import uuid
 
 import numpy as np
 
+from backend.utils.prediction_analytics import record_prediction as record_analytics
 from backend.utils.prediction_logger import log_prediction
+from backend.utils.prediction_store import record_prediction as record_stored
 from backend.utils.preprocessing import generate_engineered_features
 from backend.utils.risk_scoring import (
     calculate_feature_contributions,
     calculate_risk_scores,
 )
+from ml.admission import (
+    LEVEL_BASELINE,
+    LEVEL_FULL,
+    LEVEL_NAMES,
+    get_admission_controller,
+)
+from ml.drift_monitor import record_prediction as record_drift
 from ml.model_loader import (
     get_class_labels,
-    get_feature_order,
+    get_feature_pipeline,
+    load_metadata,
     load_model,
     predict_proba,
 )
+from ml.shadow import submit_shadow
+from ml.similarity import find_similar
+from ml.similarity import record_prediction as record_similarity
+from ml.singleflight import SingleFlight
+from ml.uncertainty import simulate_recommendations
 
 logger = logging.getLogger(__name__)
 _SHAP_EXPLAINER = None
 _SHAP_INIT_ERROR = None
 _SHAP_INIT_ATTEMPTED = False
+_SHAP_LOCK = threading.Lock()
+
+# Identical concurrent inputs share one ML + SHAP computation.
+_ML_SINGLEFLIGHT = SingleFlight()
 
 
 def _confidence_from_descending_scores(scores: dict, ranking: list) -> float:
@@ -56,26 +77,30 @@ def _get_shap_explainer():
     if _SHAP_EXPLAINER is not None:
         return _SHAP_EXPLAINER
 
-    if _SHAP_INIT_ATTEMPTED and _SHAP_INIT_ERROR is not None:
-        raise _SHAP_INIT_ERROR
+    # One thread builds the explainer; the rest wait and reuse it (or its error).
+    with _SHAP_LOCK:
+        if _SHAP_EXPLAINER is not None:
+            return _SHAP_EXPLAINER
 
-    _SHAP_INIT_ATTEMPTED = True
-    try:
-        import shap  # Imported lazily to avoid hard-failing module import paths.
+        if _SHAP_INIT_ATTEMPTED and _SHAP_INIT_ERROR is not None:
+            raise _SHAP_INIT_ERROR
 
-        _SHAP_EXPLAINER = shap.TreeExplainer(load_model())
-        return _SHAP_EXPLAINER
-    except Exception as error:
-        _SHAP_INIT_ERROR = error
-        raise
+        _SHAP_INIT_ATTEMPTED = True
+        try:
+            import shap  # Imported lazily to avoid hard-failing module import paths.
 
+            _SHAP_EXPLAINER = shap.TreeExplainer(load_model())
+            return _SHAP_EXPLAINER
+        except Exception as error:
+            _SHAP_INIT_ERROR = error
+            raise
 
-def _extract_shap_top_factors(features: dict, recommended: str, top_k: int = 3) -> list:
-    feature_order = get_feature_order()
+
+def _extract_shap_top_factors(feature_vector: np.ndarray, recommended: str, top_k: int = 3) -> list:
+    feature_order = get_feature_pipeline().feature_order
     class_labels = get_class_labels()
-    feature_vector = np.array([[features[name] for name in feature_order]])
     explainer = _get_shap_explainer()
-    shap_values = explainer.shap_values(feature_vector)
+    shap_values = explainer.shap_values(feature_vector.reshape(1, -1))
     class_index = class_labels.index(recommended)
 
     if isinstance(shap_values, list):
@@ -101,10 +126,9 @@ def _extract_shap_top_factors(features: dict, recommended: str, top_k: int = 3)
     ]
 
 
-def _build_ml_result(project) -> tuple[dict, dict]:
-    features = generate_engineered_features(project)
-    feature_order = get_feature_order()
-    feature_vector = [features[name] for name in feature_order]
+def _build_ml_result(project, explain: bool = True) -> tuple[dict, dict]:
+    pipeline = get_feature_pipeline()
+    feature_vector = pipeline.transform(project)
 
     probabilities = predict_proba(feature_vector)
     class_labels = get_class_labels()
@@ -119,12 +143,17 @@ def _build_ml_result(project) -> tuple[dict, dict]:
     ranking = sorted(risks, key=risks.get, reverse=True)
     recommended = ranking[0]
     confidence = risks[recommended]
+    features = pipeline.as_dict(feature_vector)
 
-    try:
-        top_factors = _extract_shap_top_factors(features, recommended)
-        explainability_source = "shap"
-    except Exception as shap_error:
-        logger.exception("SHAP failed, using weighted fallback: %s", shap_error)
+    top_factors = None
+    if explain:
+        try:
+            top_factors = _extract_shap_top_factors(feature_vector, recommended)
+            explainability_source = "shap"
+        except Exception as shap_error:
+            logger.exception("SHAP failed, using weighted fallback: %s", shap_error)
+
+    if top_factors is None:
         contributions = calculate_feature_contributions(features, recommended)
         top_factors = [
             {"feature": name, "impact": float(value)}
@@ -137,7 +166,7 @@ def _build_ml_result(project) -> tuple[dict, dict]:
         "risks": risks,
         "ranking": ranking,
         "confidence": confidence,
-        "model_version": "ml_v1",
+        "model_version": load_metadata().get("model_version", "ml_v1"),
         "top_contributing_factors": top_factors,
         "explainability_source": explainability_source,
     }
@@ -167,15 +196,75 @@ def _build_baseline_result(project) -> tuple[dict, dict]:
     return result, features
 
 
-def run_prediction(project_input):
-    start = time.time()
-    project_id = str(uuid.uuid4())
+def _coalesced_ml_result(project, explain: bool = True) -> tuple[dict, dict]:
+    key = (load_metadata().get("model_version"), explain, project.model_dump_json())
+    (result, features), _ = _ML_SINGLEFLIGHT.do(key, lambda: _build_ml_result(project, explain))
+
+    # Every caller gets its own copies to stamp project_id and timing onto.
+    return copy.deepcopy(result), dict(features)
+
+
+def get_coalescing_stats() -> dict:
+    return _ML_SINGLEFLIGHT.stats()
+
+
+def _attach_uncertainty(result: dict, project_input, level: int, samples: int):
+    # Optional extra: skipped under any degradation and for baseline results.
+    if level != LEVEL_FULL or result.get("model_version") == "baseline_v1":
+        result["uncertainty"] = None
+        return
+
+    try:
+        uncertainty = simulate_recommendations(project_input, samples)
+    except Exception as error:
+        logger.error("Uncertainty simulation failed: %s", error)
+        result["uncertainty"] = None
+        return
+
+    uncertainty["recommendation_stability"] = uncertainty["recommendation_frequency"].get(result["recommended"])
+    result["uncertainty"] = uncertainty
 
+
+def _attach_similar(result: dict, features: dict, level: int, k: int):
+    # Optional extra: skipped once the service has fallen back to baseline,
+    # and None while the index is still being built.
+    if level >= LEVEL_BASELINE:
+        result["similar_projects"] = None
+        return
+
+    try:
+        result["similar_projects"] = find_similar(features, k)
+    except Exception as error:
+        logger.error("Similar-project lookup failed: %s", error)
+        result["similar_projects"] = None
+
+
+def _record(sink: str, record, *args):
+    # Side channels after the CSV log: a failing store, index or analytics
+    # sink must not turn an already-logged prediction into a 500.
     try:
-        result, features = _build_ml_result(project_input)
-    except Exception as ml_error:
-        logger.error("ML prediction failed, switching to baseline: %s", ml_error)
+        record(*args)
+    except Exception as error:
+        logger.error("Recording prediction in %s failed: %s", sink, error)
+
+
+def _run_admitted_prediction(
+    project_input,
+    level: int,
+    start: float,
+    uncertainty_samples: int = None,
+    similar: int = None,
+):
+    project_id = str(uuid.uuid4())
+
+    if level >= LEVEL_BASELINE:
         result, features = _build_baseline_result(project_input)
+    else:
+        try:
+            result, features = _coalesced_ml_result(project_input, explain=level == LEVEL_FULL)
+        except Exception as ml_error:
+            logger.error("ML prediction failed, switching to baseline: %s", ml_error)
+            result, features = _build_baseline_result(project_input)
 
     logger.info(
         "SHAP enabled: %s | explainability_source: %s",
@@ -183,8 +272,41 @@ def run_prediction(project_input):
         result.get("explainability_source"),
     )
 
+    if uncertainty_samples:
+        _attach_uncertainty(result, project_input, level, uncertainty_samples)
+
+    # Queried before this prediction is indexed, so it never matches itself.
+    if similar:
+        _attach_similar(result, features, level, similar)
+
+    result["degradation_level"] = level
+    result["degradation"] = LEVEL_NAMES[level]
     result["inference_time"] = round(time.time() - start, 4)
     result["project_id"] = project_id
 
-    log_prediction(project_id, features, result)
+    logged_row = log_prediction(project_id, features, result)
+    _record("prediction store", record_stored, logged_row)
+    _record("similarity index", record_similarity, logged_row)
+    _record("analytics", record_analytics, logged_row)
+    record_drift(features, result)
+    _record("shadow runner", submit_shadow, project_id, features, result)
     return result
+
+
+def run_prediction(project_input, uncertainty_samples: int = None, similar: int = None, level: int = None):
+    """
+    level is the degradation level the caller already admitted the request
+    at (the API admits on arrival). Without it the request is admitted here.
+    """
+    start = time.time()
+    if level is not None:
+        return _run_admitted_prediction(project_input, level, start, uncertainty_samples, similar)
+
+    # Raises ml.admission.OverloadedError when the request is shed.
+    admission = get_admission_controller()
+    level = admission.admit()
+
+    try:
+        return _run_admitted_prediction(project_input, level, start, uncertainty_samples, similar)
+    finally:
+        admission.release(time.time() - start)
@@ -0,0 +1,344 @@
+"""
+OFFLINE REPLAY - Rescore logged predictions with another model bundle
+
+    python -m ml.replay --bundle path/to/candidate [--against path/to/bundle]
+                        [--log data/predictions.csv] [--out replay_report.json]
+                        [--flips-out flips.csv] [--workers 4] [--chunk-rows 50000]
+
+Streams the prediction log in chunks, rescores the stored engineered
+feature vectors with the candidate bundle on a process pool (one batched
+predict_proba per chunk, bundle loaded once per worker), and compares
+against what was served (or against a second bundle with --against).
+
+Workers return per-chunk aggregates plus only the flipped rows, and the
+parent keeps at most two chunks per worker in flight, so memory is bounded
+by chunk size regardless of log length. The JSON report holds:
+
+- flips: recommendation changes (overall and per served model_version)
+- transition_matrix: served recommendation → candidate recommendation
+- probability_deltas: candidate − served per class (mean, mean |Δ|, std,
+  max |Δ|, |Δ| quantiles from a fixed histogram)
+
+Rows served by the rule-based baseline store risk scores, not class
+probabilities, in their prob_* columns; against the served predictions they
+are left out of every comparison and only counted (baseline_rows).
+
+--flips-out writes every flipped row to CSV as it arrives.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.prediction_logger import LOG_PATH
+from ml.model_loader import load_model_bundle
+from ml.thread_config import available_cores
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+# |Δ| histogram for quantiles without keeping every delta.
+DELTA_BINS = np.linspace(0.0, 1.0, 201)
+DELTA_QUANTILES = (0.5, 0.9, 0.99)
+
+FLIP_FIELDS = [
+    "project_id",
+    "timestamp",
+    "served_model_version",
+    "before",
+    "after",
+    "before_confidence",
+    "after_confidence",
+]
+
+
+# =========================
+# WORKER
+# =========================
+
+_worker = {}
+
+
+def _init_worker(bundle_dir: str, against_dir):
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    _worker["candidate"] = load_model_bundle(bundle_dir)
+    _worker["against"] = load_model_bundle(against_dir) if against_dir else None
+
+
+def _score(bundle: dict, chunk: pd.DataFrame):
+    features = chunk[bundle["metadata"]["feature_order"]].to_numpy(dtype=np.float64)
+    labels = bundle["metadata"]["class_labels"]
+    if not len(features):
+        return np.empty((0, len(labels))), labels
+    return bundle["model"].predict_proba(features), labels
+
+
+def _compare_chunk(chunk: pd.DataFrame) -> dict:
+    candidate = _worker["candidate"]
+    feature_order = candidate["metadata"]["feature_order"]
+
+    valid = chunk[feature_order].notna().all(axis=1).to_numpy()
+    skipped = int((~valid).sum())
+    chunk = chunk[valid]
+
+    baseline_rows = 0
+    if _worker["against"] is None and "model_version" in chunk:
+        baseline = chunk["model_version"].astype(str).str.startswith("baseline").to_numpy()
+        baseline_rows = int(baseline.sum())
+        chunk = chunk[~baseline]
+
+    after_proba, after_labels = _score(candidate, chunk)
+    after = np.asarray(after_labels)[after_proba.argmax(axis=1)]
+
+    if _worker["against"] is not None:
+        before_proba, before_labels = _score(_worker["against"], chunk)
+        before = np.asarray(before_labels)[before_proba.argmax(axis=1)]
+        before_proba = pd.DataFrame(before_proba, columns=before_labels, index=chunk.index)
+    else:
+        before = chunk["recommended"].astype(str).to_numpy()
+        before_proba = pd.DataFrame({
+            column[len("prob_"):]: pd.to_numeric(chunk[column], errors="coerce")
+            for column in chunk.columns if column.startswith("prob_")
+        }, index=chunk.index)
+
+    served_versions = chunk["model_version"].astype(str).to_numpy() if "model_version" in chunk else np.full(len(chunk), "")
+    flipped = before != after
+
+    transitions = (
+        pd.crosstab(before, after).stack().loc[lambda s: s > 0]
+        if len(chunk) else pd.Series(dtype=int)
+    )
+
+    deltas = {}
+    for c, label in enumerate(after_labels):
+        if label not in before_proba:
+            continue
+        delta = after_proba[:, c] - before_proba[label].to_numpy()
+        delta = delta[~np.isnan(delta)]
+        if not len(delta):
+            continue
+        deltas[label] = {
+            "n": len(delta),
+            "sum": float(delta.sum()),
+            "sum_sq": float((delta ** 2).sum()),
+            "sum_abs": float(np.abs(delta).sum()),
+            "max_abs": float(np.abs(delta).max()),
+            "hist": np.histogram(np.abs(delta), bins=DELTA_BINS)[0],
+        }
+
+    after_index = {label: c for c, label in enumerate(after_labels)}
+    flips = pd.DataFrame({
+        "project_id": chunk["project_id"].to_numpy()[flipped],
+        "timestamp": chunk["timestamp"].to_numpy()[flipped] if "timestamp" in chunk else "",
+        "served_model_version": served_versions[flipped],
+        "before": before[flipped],
+        "after": after[flipped],
+        "before_confidence": [
+            round(float(before_proba[label].iloc[i]), 4) if label in before_proba else None
+            for i, label in zip(np.flatnonzero(flipped), before[flipped])
+        ],
+        "after_confidence": [
+            round(float(after_proba[i, after_index[label]]), 4)
+            for i, label in zip(np.flatnonzero(flipped), after[flipped])
+        ],
+    })
+
+    by_version = pd.DataFrame({"version": served_versions, "flip": flipped}).groupby("version")["flip"].agg(["size", "sum"])
+
+    return {
+        "rows": len(chunk),
+        "skipped": skipped,
+        "baseline_rows": baseline_rows,
+        "transitions": {f"{b}\t{a}": int(n) for (b, a), n in transitions.items()},
+        "deltas": deltas,
+        "by_version": {v: (int(r["size"]), int(r["sum"])) for v, r in by_version.iterrows()},
+        "flips": flips,
+    }
+
+
+# =========================
+# AGGREGATION
+# =========================
+
+class _Report:
+
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.baseline_rows = 0
+        self.transitions = {}
+        self.deltas = {}
+        self.by_version = {}
+
+    def add(self, part: dict):
+        self.rows += part["rows"]
+        self.skipped += part["skipped"]
+        self.baseline_rows += part["baseline_rows"]
+
+        for key, n in part["transitions"].items():
+            self.transitions[key] = self.transitions.get(key, 0) + n
+
+        for label, d in part["deltas"].items():
+            total = self.deltas.setdefault(label, {
+                "n": 0, "sum": 0.0, "sum_sq": 0.0, "sum_abs": 0.0, "max_abs": 0.0,
+                "hist": np.zeros(len(DELTA_BINS) - 1, dtype=np.int64),
+            })
+            for key in ("n", "sum", "sum_sq", "sum_abs"):
+                total[key] += d[key]
+            total["max_abs"] = max(total["max_abs"], d["max_abs"])
+            total["hist"] += d["hist"]
+
+        for version, (rows, flips) in part["by_version"].items():
+            seen = self.by_version.setdefault(version, [0, 0])
+            seen[0] += rows
+            seen[1] += flips
+
+    @staticmethod
+    def _quantile(hist: np.ndarray, q: float) -> float:
+        cumulative = np.cumsum(hist)
+        index = int(np.searchsorted(cumulative, q * cumulative[-1]))
+        return float(DELTA_BINS[min(index + 1, len(DELTA_BINS) - 1)])
+
+    def summary(self) -> dict:
+        flips = sum(n for key, n in self.transitions.items() if key.split("\t")[0] != key.split("\t")[1])
+
+        matrix = {}
+        for key, n in sorted(self.transitions.items()):
+            before, after = key.split("\t")
+            matrix.setdefault(before, {})[after] = n
+
+        deltas = {}
+        for label, d in self.deltas.items():
+            mean = d["sum"] / d["n"]
+            deltas[label] = {
+                "rows": d["n"],
+                "mean": round(mean, 5),
+                "mean_abs": round(d["sum_abs"] / d["n"], 5),
+                "std": round(float(np.sqrt(max(d["sum_sq"] / d["n"] - mean ** 2, 0.0))), 5),
+                "max_abs": round(d["max_abs"], 5),
+                **{f"abs_p{int(q * 100)}": self._quantile(d["hist"], q) for q in DELTA_QUANTILES},
+            }
+
+        return {
+            "rows": self.rows,
+            "skipped_rows": self.skipped,
+            "baseline_rows": self.baseline_rows,
+            "flips": flips,
+            "flip_rate": round(flips / self.rows, 5) if self.rows else None,
+            "flips_by_served_version": {
+                version: {"rows": rows, "flips": n, "flip_rate": round(n / rows, 5) if rows else None}
+                for version, (rows, n) in sorted(self.by_version.items())
+            },
+            "transition_matrix": matrix,
+            "probability_deltas": deltas,
+        }
+
+
+# =========================
+# ENTRY POINT
+# =========================
+
+def _read_columns(log_path: Path, feature_order: list) -> list:
+    with open(log_path, newline="") as file:
+        header = next(csv.reader(file))
+
+    missing = sorted(set(feature_order) - set(header))
+    if missing:
+        raise ValueError(f"Prediction log is missing feature columns: {missing}")
+
+    keep = {"project_id", "timestamp", "model_version", "recommended", *feature_order}
+    return [name for name in header if name in keep or name.startswith("prob_")]
+
+
+def replay(
+    bundle_dir,
+    log_path=LOG_PATH,
+    against_dir=None,
+    workers: int = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    flips_out=None,
+) -> dict:
+    start = time.perf_counter()
+    workers = workers or available_cores()
+    log_path = Path(log_path)
+
+    # Validates the bundle in the parent before any worker starts.
+    candidate = load_model_bundle(bundle_dir)
+    columns = _read_columns(log_path, candidate["metadata"]["feature_order"])
+
+    report = _Report()
+    flips_file = open(flips_out, "w", newline="") if flips_out else None
+    flips_writer = csv.DictWriter(flips_file, fieldnames=FLIP_FIELDS) if flips_file else None
+    if flips_writer:
+        flips_writer.writeheader()
+
+    def collect(part: dict):
+        if flips_writer and len(part["flips"]):
+            part["flips"].to_csv(flips_file, header=False, index=False)
+        report.add(part)
+
+    ctx = get_context("spawn")
+    try:
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(str(bundle_dir), against_dir and str(against_dir))) as pool:
+            pending = deque()
+            for chunk in pd.read_csv(log_path, usecols=columns, chunksize=chunk_rows, on_bad_lines="skip"):
+                pending.append(pool.apply_async(_compare_chunk, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft().get())
+            while pending:
+                collect(pending.popleft().get())
+    finally:
+        if flips_file:
+            flips_file.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "candidate": candidate["metadata"].get("model_version") or str(bundle_dir),
+        "against": str(against_dir) if against_dir else "served",
+        "log": str(log_path),
+        **report.summary(),
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(report.rows / elapsed) if elapsed else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rescore logged predictions with a model bundle.")
+    parser.add_argument("--bundle", required=True, help="Candidate bundle directory.")
+    parser.add_argument("--against", default=None, help="Compare with this bundle instead of the served predictions.")
+    parser.add_argument("--log", default=str(LOG_PATH))
+    parser.add_argument("--out", default="replay_report.json")
+    parser.add_argument("--flips-out", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    report = replay(
+        args.bundle,
+        log_path=args.log,
+        against_dir=args.against,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        flips_out=args.flips_out,
+    )
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    flip_rate = f"{report['flip_rate']:.2%}" if report["flip_rate"] is not None else "n/a"
+    print(
+        f"✅ {report['rows']:,} rows rescored in {report['seconds']}s ({report['rows_per_second'] or 0:,} rows/s) — "
+        f"{report['flips']:,} flips ({flip_rate}), {report['baseline_rows']:,} baseline rows not compared → {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+BATCH SCORER - Score a CSV of raw project inputs offline
+
+    python -m ml.score input.csv output.parquet [--bundle model/] [--shap]
+                       [--errors-out rejected.csv] [--workers 4] [--chunk-rows 50000]
+
+Reads raw ProjectInput columns in chunks and scores them on a process pool
+(bundle loaded once per worker, one vectorised validation, feature
+transform and predict_proba per chunk), skipping the HTTP, pydantic and
+per-row overhead of the API.
+
+- Validation applies the rules declared on ProjectInput (types, bounds,
+  allowed dropdown values), read from the schema so the two cannot drift.
+  Rejected rows are counted, and written with their reasons to
+  --errors-out.
+- Output (.parquet or .csv) has the input row number, project_id when
+  the input has one, recommended, confidence, runner_up, model_version
+  and prob_<class> per class; --shap adds shap_<feature> for the
+  recommended class.
+- Chunks are written in input order as they complete; at most two chunks
+  per worker are in flight, so memory does not grow with input size.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+import typing
+from collections import deque
+from multiprocessing import get_context
+from pathlib import Path
+
+import annotated_types
+import numpy as np
+import pandas as pd
+
+from backend.schemas.project_schema import ProjectInput
+from ml.feature_pipeline import RAW_INPUT_FIELDS, compile_feature_pipeline
+from ml.model_loader import MODEL_DIR, load_model_bundle
+from ml.thread_config import available_cores
+
+DEFAULT_CHUNK_ROWS = 50_000
+ID_COLUMN = "project_id"
+
+
+# =========================
+# VALIDATION
+# =========================
+
+def _field_rules() -> dict:
+    """
+    name -> (kind, bounds, choices) from the ProjectInput field declarations.
+    """
+    rules = {}
+    for name, field in ProjectInput.model_fields.items():
+        annotation = field.annotation
+        choices = None
+        if typing.get_origin(annotation) is typing.Literal:
+            choices = np.asarray(typing.get_args(annotation), dtype=np.float64)
+            kind = "choice"
+        else:
+            kind = "int" if annotation is int else "float"
+
+        bounds = []
+        for constraint in field.metadata:
+            for op in ("gt", "ge", "lt", "le"):
+                if isinstance(constraint, getattr(annotated_types, op.capitalize())):
+                    bounds.append((op, float(getattr(constraint, op))))
+        rules[name] = (kind, bounds, choices)
+    return rules
+
+
+_BOUND_CHECKS = {
+    "gt": (np.greater, "greater than"),
+    "ge": (np.greater_equal, "greater than or equal to"),
+    "lt": (np.less, "less than"),
+    "le": (np.less_equal, "less than or equal to"),
+}
+
+
+def validate_chunk(chunk: pd.DataFrame, rules: dict):
+    """
+    Numeric raw-input columns plus one error string per row ("" when valid).
+    """
+    columns = {}
+    errors = np.full(len(chunk), "", dtype=object)
+
+    def reject(mask: np.ndarray, message: str):
+        errors[mask] = np.where(errors[mask] == "", message, errors[mask] + "; " + message)
+
+    for name, (kind, bounds, choices) in rules.items():
+        values = pd.to_numeric(chunk[name], errors="coerce").to_numpy(dtype=np.float64)
+        columns[name] = values
+        missing = np.isnan(values)
+        reject(missing, f"{name}: missing or not a number")
+
+        checked = ~missing
+        if kind == "int":
+            whole = np.isfinite(values) & (np.mod(values, 1) == 0)
+            reject(checked & ~whole, f"{name}: not a whole number")
+            checked &= whole
+        elif kind == "choice":
+            reject(checked & ~np.isin(values, choices), f"{name}: must be one of {', '.join(str(int(c)) for c in choices)}")
+
+        for op, limit in bounds:
+            check, label = _BOUND_CHECKS[op]
+            reject(checked & ~check(values, limit), f"{name}: must be {label} {limit:g}")
+
+    return columns, errors
+
+
+# =========================
+# WORKER
+# =========================
+
+_worker = {}
+
+
+def _init_worker(bundle_dir: str, with_shap: bool):
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    bundle = load_model_bundle(bundle_dir)
+    _worker["bundle"] = bundle
+    _worker["pipeline"] = compile_feature_pipeline(bundle["metadata"]["feature_order"], bundle["model"])
+    _worker["rules"] = _field_rules()
+    _worker["explainer"] = None
+
+    if with_shap:
+        import shap
+
+        _worker["explainer"] = shap.TreeExplainer(bundle["model"])
+
+
+def _shap_for_recommended(features: np.ndarray, recommended_index: np.ndarray) -> np.ndarray:
+    values = _worker["explainer"].shap_values(features)
+    if isinstance(values, list):
+        values = np.stack(values, axis=-1)
+    values = getattr(values, "values", values)
+    # (n, features, classes) -> (n, features) for each row's recommended class.
+    return values[np.arange(len(features)), :, recommended_index]
+
+
+def _score_chunk(chunk: pd.DataFrame) -> dict:
+    bundle = _worker["bundle"]
+    pipeline = _worker["pipeline"]
+    labels = np.asarray(bundle["metadata"]["class_labels"])
+
+    columns, errors = validate_chunk(chunk, _worker["rules"])
+    valid = errors == ""
+    rows = chunk.index.to_numpy()
+
+    features = pipeline.transform_batch({name: columns[name][valid] for name in RAW_INPUT_FIELDS})
+    probabilities = bundle["model"].predict_proba(features) if len(features) else np.empty((0, len(labels)))
+    order = np.argsort(probabilities, axis=1)
+
+    result = {"row": rows[valid]}
+    if ID_COLUMN in chunk:
+        result[ID_COLUMN] = chunk[ID_COLUMN].to_numpy()[valid]
+    result["recommended"] = labels[order[:, -1]] if len(features) else np.empty(0, dtype=object)
+    result["confidence"] = probabilities.max(axis=1, initial=0.0).round(4)
+    result["runner_up"] = labels[order[:, -2]] if len(features) else np.empty(0, dtype=object)
+    result["model_version"] = bundle["metadata"].get("model_version", "ml_v1")
+    for c, label in enumerate(labels):
+        result[f"prob_{label}"] = probabilities[:, c].round(4)
+
+    if _worker["explainer"] is not None:
+        shap_values = _shap_for_recommended(features, order[:, -1]) if len(features) else np.empty((0, pipeline.n_features))
+        for j, name in enumerate(pipeline.feature_order):
+            result[f"shap_{name}"] = shap_values[:, j].round(6)
+
+    rejected = chunk[~valid].copy()
+    rejected.insert(0, "row", rows[~valid])
+    rejected["error"] = errors[~valid]
+
+    return {"scored": pd.DataFrame(result), "rejected": rejected}
+
+
+# =========================
+# OUTPUT
+# =========================
+
+class _ParquetSink:
+
+    def __init__(self, path: Path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise RuntimeError("Parquet output requires pyarrow; install it or write .csv") from error
+
+        self._pa, self._pq = pa, pq
+        self._path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, frame: pd.DataFrame):
+        table = self._pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._pq.ParquetWriter(self._path, self._schema)
+        self._writer.write_table(table)
+
+    def close(self, empty: pd.DataFrame):
+        if self._writer is None:
+            self._pq.write_table(self._pa.Table.from_pandas(empty, preserve_index=False), self._path)
+        else:
+            self._writer.close()
+
+
+class _CsvSink:
+
+    def __init__(self, path: Path):
+        self._file = open(path, "w", newline="")
+        self._header = True
+
+    def write(self, frame: pd.DataFrame):
+        frame.to_csv(self._file, header=self._header, index=False)
+        self._header = False
+
+    def close(self, empty: pd.DataFrame):
+        if self._header:
+            empty.to_csv(self._file, index=False)
+        self._file.close()
+
+
+def _open_sink(path: Path):
+    if path.suffix.lower() == ".parquet":
+        return _ParquetSink(path)
+    if path.suffix.lower() == ".csv":
+        return _CsvSink(path)
+    raise ValueError(f"Unsupported output format '{path.suffix}' (use .parquet or .csv)")
+
+
+# =========================
+# ENTRY POINT
+# =========================
+
+def _read_columns(input_path: Path) -> list:
+    with open(input_path, newline="") as file:
+        header = next(csv.reader(file), [])
+
+    missing = [name for name in ProjectInput.model_fields if name not in header]
+    if missing:
+        raise ValueError(f"Input is missing ProjectInput columns: {missing}")
+
+    return [name for name in header if name in ProjectInput.model_fields or name == ID_COLUMN]
+
+
+def score_file(
+    input_path,
+    output_path,
+    bundle_dir=MODEL_DIR,
+    with_shap: bool = False,
+    errors_out=None,
+    workers: int = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> dict:
+    start = time.perf_counter()
+    workers = workers or available_cores()
+    input_path, output_path = Path(input_path), Path(output_path)
+
+    # Validates the bundle and the input header before any worker starts.
+    bundle = load_model_bundle(bundle_dir)
+    columns = _read_columns(input_path)
+    dtypes = {ID_COLUMN: str} if ID_COLUMN in columns else None
+
+    sink = _open_sink(output_path)
+    errors_file = open(errors_out, "w", newline="") if errors_out else None
+    counts = {"rows": 0, "scored": 0, "rejected": 0}
+    empty = None
+
+    def collect(part: dict):
+        nonlocal empty
+        scored, rejected = part["scored"], part["rejected"]
+        counts["rows"] += len(scored) + len(rejected)
+        counts["scored"] += len(scored)
+        counts["rejected"] += len(rejected)
+
+        if len(scored):
+            sink.write(scored)
+        elif empty is None:
+            empty = scored
+        if errors_file and len(rejected):
+            rejected.to_csv(errors_file, header=errors_file.tell() == 0, index=False)
+
+    ctx = get_context("spawn")
+    try:
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(str(bundle_dir), with_shap)) as pool:
+            pending = deque()
+            for chunk in pd.read_csv(input_path, usecols=columns, dtype=dtypes, chunksize=chunk_rows, low_memory=False):
+                pending.append(pool.apply_async(_score_chunk, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft().get())
+            while pending:
+                collect(pending.popleft().get())
+    finally:
+        sink.close(empty if empty is not None else pd.DataFrame())
+        if errors_file:
+            errors_file.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "input": str(input_path),
+        "output": str(output_path),
+        "model_version": bundle["metadata"].get("model_version", "ml_v1"),
+        **counts,
+        "shap": with_shap,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(counts["rows"] / elapsed) if elapsed else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV of raw project inputs with a model bundle.")
+    parser.add_argument("input", help="CSV with one ProjectInput per row (optional project_id column).")
+    parser.add_argument("output", help="Output file, .parquet or .csv.")
+    parser.add_argument("--bundle", default=str(MODEL_DIR), help="Model bundle directory.")
+    parser.add_argument("--shap", action="store_true", help="Add shap_<feature> columns for the recommended class.")
+    parser.add_argument("--errors-out", default=None, help="CSV for rejected rows and their reasons.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--report", default=None, help="Also write the run summary as JSON.")
+    args = parser.parse_args(argv)
+
+    report = score_file(
+        args.input,
+        args.output,
+        bundle_dir=args.bundle,
+        with_shap=args.shap,
+        errors_out=args.errors_out,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+    )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print(
+        f"✅ {report['scored']:,} rows scored, {report['rejected']:,} rejected in {report['seconds']}s "
+        f"({report['rows_per_second']:,} rows/s, {report['workers']} workers) → {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+SHADOW INFERENCE - Candidate models on live traffic, off the request path
+
+Bundles listed in SDLC_SHADOW_BUNDLES (comma-separated directories holding
+model.ubj or model.pkl + model_metadata.json) score the same features as every live
+/predict on a single background worker. The hand-off queue is bounded and
+submissions never block: when it is full the work is dropped and counted,
+so primary latency is unaffected.
+
+- Candidates are keyed by bundle fingerprint (content hash), since a
+  retrained candidate usually keeps the primary's model_version.
+- Latency is compared like for like: the worker times the primary model's
+  predict_proba on the same vector next to each candidate's. The
+  end-to-end request time is still logged as primary_inference_time.
+- Predictions that fell back to the baseline have no model output to
+  compare against and are skipped.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from backend.utils.prediction_analytics import P2Quantile
+from backend.utils.prediction_logger import log_shadow_prediction
+from ml.model_loader import get_feature_order, load_model, load_model_bundle
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 256
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _configured_bundles() -> list:
+    raw = os.getenv("SDLC_SHADOW_BUNDLES", "")
+    return [path.strip() for path in raw.split(",") if path.strip()]
+
+
+def _configured_queue_size() -> int:
+    return int(os.getenv("SDLC_SHADOW_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+
+
+class _LatencyStats:
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.quantiles = {p: P2Quantile(p) for p in LATENCY_QUANTILES}
+
+    def add(self, latency_ms: float):
+        self.count += 1
+        self.total += latency_ms
+        for estimator in self.quantiles.values():
+            estimator.add(latency_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            **{
+                f"p{int(p * 100)}": round(e.value(), 3) if e.value() is not None else None
+                for p, e in self.quantiles.items()
+            },
+        }
+
+
+class _Candidate:
+
+    def __init__(self, bundle: dict):
+        self.model = bundle["model"]
+        self.metadata = bundle["metadata"]
+        self.path = bundle["path"]
+        self.fingerprint = bundle["fingerprint"]
+        self.model_version = self.metadata.get("model_version")
+        self.name = f"{self.model_version or self.path}@{self.fingerprint}"
+        self.feature_order = self.metadata["feature_order"]
+        self.class_labels = self.metadata["class_labels"]
+
+        self.scored = 0
+        self.agreements = 0
+        self.errors = 0
+        self.latency = _LatencyStats()
+        self.primary_latency = _LatencyStats()
+
+
+class ShadowRunner:
+
+    def __init__(self, candidates: list, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.candidates = candidates
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.skipped_baseline = 0
+        self._thread = threading.Thread(target=self._work, name="sdlc-shadow", daemon=True)
+        self._thread.start()
+
+    def submit(self, project_id: str, features: dict, primary: dict):
+        if str(primary.get("model_version")).startswith("baseline"):
+            with self._lock:
+                self.skipped_baseline += 1
+            return
+
+        try:
+            self._queue.put_nowait((project_id, features, primary))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+
+        with self._lock:
+            self.submitted += 1
+
+    def _work(self):
+        while True:
+            project_id, features, primary = self._queue.get()
+            for candidate in self.candidates:
+                try:
+                    self._score(candidate, project_id, features, primary)
+                except Exception as error:
+                    with self._lock:
+                        candidate.errors += 1
+                    logger.warning("Shadow model %s failed: %s", candidate.name, error)
+            self._queue.task_done()
+
+    def _score(self, candidate: _Candidate, project_id: str, features: dict, primary: dict):
+        vector = np.array([[features[name] for name in candidate.feature_order]])
+        primary_vector = np.array([[features[name] for name in get_feature_order()]])
+        primary_model = load_model()
+
+        start = time.perf_counter()
+        primary_model.predict_proba(primary_vector)
+        primary_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        probabilities = candidate.model.predict_proba(vector)[0]
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        risks = {
+            candidate.class_labels[i]: round(float(probabilities[i]), 4)
+            for i in range(len(candidate.class_labels))
+        }
+        recommended = max(risks, key=risks.get)
+        agreement = recommended == primary["recommended"]
+
+        with self._lock:
+            candidate.scored += 1
+            candidate.agreements += agreement
+            candidate.latency.add(latency_ms)
+            candidate.primary_latency.add(primary_ms)
+
+        log_shadow_prediction({
+            "project_id": project_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "primary_model_version": primary["model_version"],
+            "primary_recommended": primary["recommended"],
+            "primary_inference_time": primary["inference_time"],
+            "primary_model_time": round(primary_ms / 1000, 4),
+            "candidate_model_version": candidate.model_version,
+            "candidate_fingerprint": candidate.fingerprint,
+            "candidate_recommended": recommended,
+            "candidate_confidence": risks[recommended],
+            "candidate_inference_time": round(latency_ms / 1000, 4),
+            "agreement": int(agreement),
+            "candidate_probabilities": json.dumps(risks),
+        })
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "skipped_baseline": self.skipped_baseline,
+                "candidates": {
+                    c.fingerprint: {
+                        "path": c.path,
+                        "model_version": c.model_version,
+                        "scored": c.scored,
+                        "errors": c.errors,
+                        "agreement_rate": round(c.agreements / c.scored, 4) if c.scored else None,
+                        "candidate_latency_ms": c.latency.snapshot(),
+                        "primary_latency_ms": c.primary_latency.snapshot(),
+                    }
+                    for c in self.candidates
+                },
+            }
+
+
+# =========================
+# CACHED INSTANCE
+# =========================
+
+_runner = None
+
+
+def start_shadow_runner():
+    """
+    Load the configured candidate bundles and start the worker. A bundle
+    that fails to load is skipped; with no candidates shadowing stays off.
+    """
+    global _runner
+
+    candidates = {}
+    for path in _configured_bundles():
+        try:
+            candidate = _Candidate(load_model_bundle(path))
+        except Exception as error:
+            logger.error("Skipping shadow bundle %s: %s", path, error)
+            continue
+
+        if candidate.fingerprint in candidates:
+            logger.warning("Skipping shadow bundle %s: same content as %s", path, candidates[candidate.fingerprint].path)
+            continue
+        candidates[candidate.fingerprint] = candidate
+
+    candidates = list(candidates.values())
+
+    if candidates:
+        _runner = ShadowRunner(candidates, queue_size=_configured_queue_size())
+        logger.info("Shadow inference enabled for %s", [c.name for c in candidates])
+
+    return _runner
+
+
+def submit_shadow(project_id: str, features: dict, primary: dict):
+    if _runner is not None:
+        _runner.submit(project_id, features, primary)
+
+
+def get_shadow_metrics() -> dict:
+    if _runner is None:
+        return {"enabled": False}
+    return _runner.metrics()
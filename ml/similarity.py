@@ -0,0 +1,308 @@
+"""
+SIMILAR PROJECTS - Nearest-neighbour index over engineered features
+
+Every training project and every logged prediction is a point in the
+28-dimensional engineered feature space, standardised with the training
+set's mean and standard deviation (fixed at build time, so new points
+never require re-scaling existing ones).
+
+- Storage is a growable float32 matrix plus squared norms; appends are
+  amortised O(1) and happen as predictions are logged.
+- Queries are exact: one blocked matrix-vector product over every row and
+  an argpartition shortlist per block, re-ranked with exact float64
+  distances (the float32 norm expansion loses precision to cancellation).
+  No approximate layer, so neighbours never depend on index size.
+- The index is built on a background thread at startup. Until it is
+  published, find_similar returns None instead of blocking the caller.
+
+Outcomes are attached at query time: training projects report their
+optimal SDLC, logged ones their recommendation plus any actual_sdlc_used
+from feedback (read fresh from the prediction store).
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.ml.feature_config import FEATURE_ORDER
+from backend.utils.prediction_store import get_prediction_store
+from ml.global_explain import TRAINING_DATA_PATH
+
+logger = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 4096
+BLOCK_ROWS = 262_144
+STORE_PAGE_ROWS = 50_000
+MAX_PENDING_ROWS = 100_000
+DEFAULT_K = 5
+# Shortlist size, as a multiple of k, re-ranked with exact distances.
+RERANK_FACTOR = 4
+MAX_SIMILAR = 50
+SEED = 42
+
+
+class SimilarityIndex:
+
+    def __init__(self, mean: np.ndarray, std: np.ndarray):
+        self.mean = mean.astype(np.float32)
+        self.scale = np.where(std > 0, std, 1.0).astype(np.float32)
+
+        self._lock = threading.Lock()
+        self._vectors = np.empty((INITIAL_CAPACITY, len(FEATURE_ORDER)), dtype=np.float32)
+        self._norms = np.empty(INITIAL_CAPACITY, dtype=np.float32)
+        self._size = 0
+        self._meta = []
+        self._rows_by_id = {}
+
+    def __len__(self):
+        return self._size
+
+    # =========================
+    # INSERTION
+    # =========================
+
+    def standardize(self, vectors) -> np.ndarray:
+        return (np.asarray(vectors, dtype=np.float32) - self.mean) / self.scale
+
+    def _grow(self, needed: int):
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.empty((capacity, self._vectors.shape[1]), dtype=np.float32)
+        norms = np.empty(capacity, dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        norms[:self._size] = self._norms[:self._size]
+        self._vectors, self._norms = vectors, norms
+
+    def add_many(self, vectors, metas: list):
+        """
+        Append raw (unstandardised) feature rows in FEATURE_ORDER with one
+        metadata dict each (project_id, source, sdlc, timestamp).
+        """
+        z = self.standardize(vectors)
+        if z.ndim == 1:
+            z = z[None, :]
+
+        with self._lock:
+            start = self._size
+            self._grow(start + len(z))
+            self._vectors[start:start + len(z)] = z
+            self._norms[start:start + len(z)] = (z * z).sum(axis=1)
+            self._size += len(z)
+
+            for offset, meta in enumerate(metas):
+                self._meta.append(meta)
+                if meta["source"] == "logged":
+                    self._rows_by_id[meta["project_id"]] = start + offset
+
+    # =========================
+    # QUERY
+    # =========================
+
+    def query(self, vector, k: int = DEFAULT_K, exclude_row: int = None) -> list:
+        """
+        (row, distance) for the k nearest points to a raw feature row.
+        """
+        z = self.standardize(vector)
+        shortlist = k * RERANK_FACTOR
+
+        # Rows below size never change and a reallocation leaves the old
+        # arrays intact, so the scan runs outside the lock.
+        with self._lock:
+            size, all_vectors, all_norms = self._size, self._vectors, self._norms
+
+        best_rows, best_distances = [], []
+        for offset in range(0, size, BLOCK_ROWS):
+            end = min(offset + BLOCK_ROWS, size)
+            rows = np.arange(offset, end)
+            distances = all_norms[offset:end] - 2 * all_vectors[offset:end] @ z
+            if exclude_row is not None:
+                distances = np.where(rows == exclude_row, np.inf, distances)
+            take = min(shortlist, len(distances))
+            if not take:
+                continue
+            top = np.argpartition(distances, take - 1)[:take]
+            best_rows.append(rows[top])
+            best_distances.append(distances[top])
+
+        if not best_rows:
+            return []
+
+        rows = np.concatenate(best_rows)
+        distances = np.concatenate(best_distances)
+        rows = rows[np.argsort(distances)[:shortlist]]
+        rows = rows[rows != exclude_row] if exclude_row is not None else rows
+
+        vectors = all_vectors[rows].astype(np.float64)
+        exact = np.sqrt(((vectors - z.astype(np.float64)) ** 2).sum(axis=1))
+        order = np.argsort(exact, kind="stable")[:k]
+        return [(int(rows[i]), float(exact[i])) for i in order]
+
+    def row_for(self, project_id: str):
+        return self._rows_by_id.get(project_id)
+
+    def meta(self, row: int) -> dict:
+        return self._meta[row]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rows": self._size, "mode": "exact"}
+
+
+# =========================
+# BUILD
+# =========================
+
+def _logged_meta(row: dict) -> dict:
+    return {"project_id": row["project_id"], "source": "logged", "sdlc": row["recommended"], "timestamp": row["timestamp"]}
+
+
+def _load_training(feature_order: list):
+    df = pd.read_csv(TRAINING_DATA_PATH)
+    best = df[df["is_best"] == 1]
+    metas = [
+        {"project_id": str(pid), "source": "training", "sdlc": sdlc, "timestamp": None}
+        for pid, sdlc in zip(best["project_id"], best["sdlc_type"])
+    ]
+    return best[feature_order].to_numpy(dtype=np.float64), metas
+
+
+def _iter_logged(feature_order: list):
+    """
+    Pages of (vectors, metas) from the prediction store, newest first.
+    """
+    store = get_prediction_store()
+    columns = ["timestamp", "project_id", "recommended", *feature_order]
+    after = None
+
+    while True:
+        rows = store.page(columns, STORE_PAGE_ROWS, after=after)
+        if not rows:
+            return
+        after = (rows[-1]["timestamp"], rows[-1]["project_id"])
+
+        frame = pd.DataFrame(rows)
+        vectors = frame[feature_order].to_numpy(dtype=np.float64)
+        complete = ~np.isnan(vectors).any(axis=1)
+        metas = [_logged_meta(row) for row, keep in zip(rows, complete) if keep]
+        yield vectors[complete], metas
+
+
+def build_similarity_index() -> SimilarityIndex:
+    started = time.perf_counter()
+    training, training_metas = _load_training(FEATURE_ORDER)
+
+    index = SimilarityIndex(training.mean(axis=0), training.std(axis=0))
+    index.add_many(training, training_metas)
+    for vectors, metas in _iter_logged(FEATURE_ORDER):
+        index.add_many(vectors, metas)
+
+    logger.info("Similarity index built: %d rows in %.2fs", len(index), time.perf_counter() - started)
+    return index
+
+
+# =========================
+# CACHED INSTANCE
+# =========================
+
+_index = None
+_index_lock = threading.Lock()
+
+# Rows logged while the index is being built, added once it is published.
+_pending = []
+_pending_lock = threading.Lock()
+
+
+def _add_logged(index: SimilarityIndex, rows: list):
+    index.add_many(
+        [[float(row[name]) for name in FEATURE_ORDER] for row in rows],
+        [_logged_meta(row) for row in rows],
+    )
+
+
+def get_similarity_index() -> SimilarityIndex:
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = build_similarity_index()
+                with _pending_lock:
+                    late = [row for row in _pending if index.row_for(row["project_id"]) is None]
+                    if late:
+                        _add_logged(index, late)
+                    _pending.clear()
+                    _index = index
+
+    return _index
+
+
+_build_started = False
+
+
+def start_similarity_index_in_background():
+    """
+    Start the build once; later calls are no-ops.
+    """
+    global _build_started
+
+    with _pending_lock:
+        if _build_started:
+            return
+        _build_started = True
+    threading.Thread(target=get_similarity_index, name="sdlc-similarity-build", daemon=True).start()
+
+
+def record_prediction(row: dict):
+    """
+    Add one logged prediction row; queued while the index is being built.
+    Never raises.
+    """
+    try:
+        with _pending_lock:
+            if _index is None:
+                if len(_pending) < MAX_PENDING_ROWS:
+                    _pending.append(row)
+                return
+        _add_logged(_index, [row])
+    except Exception as error:
+        logger.warning("Similarity index update failed: %s", error)
+
+
+def find_similar(features: dict, k: int = DEFAULT_K, exclude_project_id: str = None):
+    """
+    k nearest historical projects to an engineered feature dict, or None
+    while the index is still being built (the build is started if needed).
+    """
+    index = _index
+    if index is None:
+        start_similarity_index_in_background()
+        return None
+
+    exclude_row = index.row_for(exclude_project_id) if exclude_project_id else None
+    neighbours = index.query([float(features[name]) for name in FEATURE_ORDER], k, exclude_row)
+
+    metas = [index.meta(row) for row, _ in neighbours]
+    logged_ids = [meta["project_id"] for meta in metas if meta["source"] == "logged"]
+    outcomes = get_prediction_store().get_many(logged_ids, ["actual_sdlc_used"]) if logged_ids else {}
+
+    results = []
+    for (row, distance), meta in zip(neighbours, metas):
+        entry = {
+            "project_id": meta["project_id"],
+            "source": meta["source"],
+            "distance": round(distance, 4),
+        }
+        if meta["source"] == "training":
+            entry["optimal_sdlc"] = meta["sdlc"]
+        else:
+            entry["recommended"] = meta["sdlc"]
+            entry["timestamp"] = meta["timestamp"]
+            entry["actual_sdlc_used"] = (outcomes.get(meta["project_id"]) or {}).get("actual_sdlc_used")
+        results.append(entry)
+    return results
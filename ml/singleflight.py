@@ -0,0 +1,73 @@
+"""
+SINGLEFLIGHT - Coalesce identical concurrent computations
+
+Callers that ask for the same key while a computation for it is running
+wait for that computation and share its result instead of starting their
+own. The entry is dropped as soon as the computation finishes, so results
+are never cached beyond the in-flight window.
+"""
+
+import threading
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run fn() once per key among concurrent callers.
+
+        Returns (value, shared) where shared is True for callers that
+        received another caller's result. Errors propagate to every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.value, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_rate": round(self.coalesced / total, 4) if total else None,
+            }
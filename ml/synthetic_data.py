@@ -0,0 +1,347 @@
+"""
+SYNTHETIC SDLC DATASET GENERATOR - Seeded, chunked, parallel
+
+Produces long-format datasets shaped like data/sdlc_dataset_1800.csv (28
+engineered features, project_id, sdlc_type, suitability_score, is_best)
+at arbitrary scale for performance testing of training and scoring.
+
+    python -m ml.synthetic_data --rows 10000000 --out data/synthetic_10m.parquet --workers 8
+
+- Features follow the reference's empirical marginals and their
+  correlation structure (Gaussian copula), drawn once per project and
+  repeated across its SDLC rows.
+- suitability_score comes from per-SDLC linear fits on the reference plus
+  residual noise. Exactly one SDLC per project has is_best = 1, always
+  one of the labels that are best in the reference (never Hybrid), with
+  the reference label mix (see fit_reference).
+- Each chunk of projects gets its own RNG stream derived from (seed,
+  chunk index), so output is identical for any worker count.
+- Memory is bounded by chunk size times the number of chunks in flight.
+  A single output file is written in order by the parent process;
+  --partitioned lets every worker write its own part file instead.
+
+Parquet output requires pyarrow.
+"""
+
+import argparse
+import math
+import os
+import time
+from collections import deque
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from ml.feature_config import FEATURE_ORDER
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+REFERENCE_PATH = BASE_DIR / "data" / "sdlc_dataset_1800.csv"
+
+DEFAULT_CHUNK_PROJECTS = 50_000
+RIDGE = 1e-3
+DISCRETE_MAX_LEVELS = 30
+CALIBRATION_PROJECTS = 200_000
+CALIBRATION_ITERATIONS = 30
+CALIBRATION_RATE = 0.5
+CALIBRATION_SEED = 0
+
+
+# =========================
+# REFERENCE FITTING
+# =========================
+
+def fit_reference(reference_path=REFERENCE_PATH, calibration_projects: int = CALIBRATION_PROJECTS) -> dict:
+    """
+    Everything a worker needs to sample projects like the reference set:
+
+    - features: a Gaussian copula (normal-score correlation of the 28
+      features, one row per project) over each feature's empirical
+      quantile function; features with few distinct values keep exactly
+      those values.
+    - suitability: per-SDLC linear fit of suitability_score on the
+      features, with that SDLC's residual spread as noise.
+    - labels: is_best is the argmax over SDLC types that are ever best in
+      the reference (Hybrid never is), with per-type offsets calibrated so
+      the label mix matches the reference.
+    """
+    df = pd.read_csv(reference_path)
+    projects = df.drop_duplicates("project_id").set_index("project_id")[FEATURE_ORDER]
+    values = projects.to_numpy(dtype=float)
+    n = len(values)
+
+    normal_scores = ndtri(projects.rank(method="average").to_numpy() / (n + 1))
+    correlation = np.corrcoef(normal_scores, rowvar=False)
+    # Duplicated features make the matrix singular; clip to positive definite.
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    correlation = (eigenvectors * np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(correlation))
+    correlation /= np.outer(scale, scale)
+
+    suitability = df.pivot(index="project_id", columns="sdlc_type", values="suitability_score").loc[projects.index]
+    sdlc_types = list(suitability.columns)
+    design = np.column_stack([np.ones(n), values])
+    coefficients = np.linalg.solve(
+        design.T @ design + RIDGE * np.eye(design.shape[1]), design.T @ suitability.to_numpy()
+    )
+    residual_std = (suitability.to_numpy() - design @ coefficients).std(axis=0)
+
+    best_share = df.loc[df["is_best"] == 1, "sdlc_type"].value_counts(normalize=True)
+    target_mix = np.array([best_share.get(sdlc, 0.0) for sdlc in sdlc_types])
+
+    params = {
+        "sdlc_types": sdlc_types,
+        "sorted_values": np.sort(values, axis=0),
+        "discrete": projects.nunique().to_numpy() <= DISCRETE_MAX_LEVELS,
+        "cholesky": np.linalg.cholesky(correlation),
+        "coefficients": coefficients,
+        "residual_std": residual_std,
+        "eligible": target_mix > 0,
+        "offsets": np.zeros(len(sdlc_types)),
+        "target_mix": target_mix,
+    }
+    params["offsets"] = _calibrate_offsets(params, calibration_projects)
+    return params
+
+
+def _sample_features(rng: np.random.Generator, n_projects: int, params: dict) -> np.ndarray:
+    uniforms = ndtr(rng.standard_normal((n_projects, len(FEATURE_ORDER))) @ params["cholesky"].T)
+    features = np.empty_like(uniforms)
+    for j in range(len(FEATURE_ORDER)):
+        features[:, j] = np.quantile(
+            params["sorted_values"][:, j],
+            uniforms[:, j],
+            method="inverted_cdf" if params["discrete"][j] else "linear",
+        )
+    return features
+
+
+def _raw_suitability(rng: np.random.Generator, features: np.ndarray, params: dict) -> np.ndarray:
+    noise = rng.standard_normal((len(features), len(params["sdlc_types"]))) * params["residual_std"]
+    return features @ params["coefficients"][1:] + params["coefficients"][0] + noise
+
+
+def _best(suitability: np.ndarray, params: dict) -> np.ndarray:
+    return np.where(params["eligible"], suitability + params["offsets"], -np.inf).argmax(axis=1)
+
+
+def _calibrate_offsets(params: dict, n_projects: int) -> np.ndarray:
+    """
+    Per-type additive offsets that bring the sampled label mix to the
+    reference mix (multiplicative updates on a fixed calibration sample).
+    """
+    rng = np.random.default_rng(CALIBRATION_SEED)
+    suitability = _raw_suitability(rng, _sample_features(rng, n_projects, params), params)
+    target = params["target_mix"]
+    eligible = params["eligible"]
+    # Scale of the decisions being moved: the typical top-1 / top-2 gap.
+    top = np.sort(suitability[:, eligible], axis=1)
+    step = np.median(top[:, -1] - top[:, -2])
+
+    offsets = np.zeros(len(target))
+    for _ in range(CALIBRATION_ITERATIONS):
+        mix = np.bincount(_best(suitability, {**params, "offsets": offsets}), minlength=len(target)) / n_projects
+        offsets[eligible] += CALIBRATION_RATE * step * np.log(target[eligible] / np.maximum(mix[eligible], 1e-6))
+    return offsets
+
+
+# =========================
+# CHUNK GENERATION
+# =========================
+
+def generate_chunk(chunk_index: int, first_project: int, n_projects: int, seed: int, params: dict) -> pd.DataFrame:
+    rng = np.random.default_rng([seed, chunk_index])
+    sdlc_types = params["sdlc_types"]
+    n_sdlc = len(sdlc_types)
+
+    features = _sample_features(rng, n_projects, params)
+    suitability = _raw_suitability(rng, features, params)
+    best = _best(suitability, params)
+
+    # The calibrated offsets only pick the label; the best row keeps the
+    # highest score and ineligible types stay strictly below it.
+    suitability = np.clip(suitability, 0, 1)
+    best_score = suitability[np.arange(n_projects), best]
+    suitability = np.minimum(suitability, best_score[:, None] - 1e-4)
+    suitability[np.arange(n_projects), best] = best_score
+    suitability = np.clip(suitability, 0, 1).round(4)
+
+    project_ids = np.char.add(
+        "project_", np.arange(first_project + 1, first_project + n_projects + 1).astype(str)
+    )
+
+    frame = pd.DataFrame(np.repeat(features, n_sdlc, axis=0), columns=FEATURE_ORDER)
+    frame["project_id"] = np.repeat(project_ids, n_sdlc)
+    frame["sdlc_type"] = np.tile(sdlc_types, n_projects)
+    frame["suitability_score"] = suitability.ravel()
+    frame["is_best"] = (np.tile(np.arange(n_sdlc), n_projects) == np.repeat(best, n_sdlc)).astype(np.int8)
+    return frame
+
+
+def _chunk_plan(n_projects: int, chunk_projects: int) -> list:
+    return [
+        (i, start, min(chunk_projects, n_projects - start))
+        for i, start in enumerate(range(0, n_projects, chunk_projects))
+    ]
+
+
+# =========================
+# WRITERS
+# =========================
+
+def _output_format(path: Path) -> str:
+    suffixes = "".join(path.suffixes).lower()
+    if suffixes.endswith(".parquet"):
+        return "parquet"
+    if ".csv" in suffixes:
+        return "csv"
+    raise ValueError(f"Unsupported output format for {path}; use .csv, .csv.gz or .parquet")
+
+
+def _write_part(frame: pd.DataFrame, path: Path, fmt: str):
+    if fmt == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def _generate_part(args) -> int:
+    chunk_index, first_project, n_projects, seed, params, out_dir, fmt = args
+    frame = generate_chunk(chunk_index, first_project, n_projects, seed, params)
+    suffix = "parquet" if fmt == "parquet" else "csv"
+    _write_part(frame, Path(out_dir) / f"part-{chunk_index:05d}.{suffix}", fmt)
+    return len(frame)
+
+
+def _generate_only(args) -> pd.DataFrame:
+    return generate_chunk(*args)
+
+
+class _SingleFileWriter:
+
+    def __init__(self, path: Path, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._parquet = None
+        self._wrote_header = False
+
+    def write(self, frame: pd.DataFrame):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(
+                self.path,
+                mode="a" if self._wrote_header else "w",
+                header=not self._wrote_header,
+                index=False,
+            )
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+# =========================
+# ENTRY POINT
+# =========================
+
+def generate_dataset(
+    rows: int,
+    out,
+    seed: int = 42,
+    workers: int = None,
+    chunk_projects: int = DEFAULT_CHUNK_PROJECTS,
+    partitioned: bool = False,
+    fmt: str = None,
+    reference_path=REFERENCE_PATH,
+) -> dict:
+    out = Path(out)
+    fmt = fmt or _output_format(out)
+    workers = workers or os.cpu_count() or 1
+    params = fit_reference(reference_path)
+    n_projects = math.ceil(rows / len(params["sdlc_types"]))
+    plan = _chunk_plan(n_projects, chunk_projects)
+
+    start = time.perf_counter()
+    written = 0
+    ctx = get_context("spawn")
+
+    with ctx.Pool(workers) as pool:
+        if partitioned:
+            out.mkdir(parents=True, exist_ok=True)
+            tasks = [(*chunk, seed, params, str(out), fmt) for chunk in plan]
+            for n in pool.imap_unordered(_generate_part, tasks):
+                written += n
+        else:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            writer = _SingleFileWriter(out, fmt)
+            pending = deque()
+            tasks = [(*chunk, seed, params) for chunk in plan]
+
+            # Keep at most 2 chunks per worker in flight so memory stays bounded
+            # even when the writer is slower than the generators.
+            try:
+                for task in tasks:
+                    pending.append(pool.apply_async(_generate_only, (task,)))
+                    if len(pending) >= 2 * workers:
+                        frame = pending.popleft().get()
+                        writer.write(frame)
+                        written += len(frame)
+                while pending:
+                    frame = pending.popleft().get()
+                    writer.write(frame)
+                    written += len(frame)
+            finally:
+                writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": written,
+        "projects": n_projects,
+        "chunks": len(plan),
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(written / elapsed) if elapsed else None,
+        "output": str(out),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic SDLC dataset.")
+    parser.add_argument("--rows", type=int, required=True, help="Target row count (rounded up to whole projects).")
+    parser.add_argument("--out", required=True, help="Output .csv, .csv.gz or .parquet path (a directory with --partitioned).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-projects", type=int, default=DEFAULT_CHUNK_PROJECTS)
+    parser.add_argument("--partitioned", action="store_true", help="Write one part file per chunk from the workers.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None, help="Override the format inferred from --out.")
+    parser.add_argument("--reference", default=str(REFERENCE_PATH))
+    args = parser.parse_args(argv)
+
+    summary = generate_dataset(
+        rows=args.rows,
+        out=args.out,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_projects=args.chunk_projects,
+        partitioned=args.partitioned,
+        fmt=args.format,
+        reference_path=args.reference,
+    )
+    print(
+        f"✅ {summary['rows']:,} rows ({summary['projects']:,} projects) in {summary['seconds']}s "
+        f"— {summary['rows_per_second']:,} rows/s with {summary['workers']} workers → {summary['output']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
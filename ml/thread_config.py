@@ -0,0 +1,94 @@
+"""
+CPU THREAD BUDGET - One place to size every thread pool
+
+Three layers can each spawn threads: the request threadpool (Starlette
+runs sync routes on anyio's worker threads), xgboost's OpenMP pool
+(nthread), and BLAS / OpenMP pools used by NumPy and SHAP. Left alone,
+each sizes itself to all cores and concurrent requests oversubscribe the
+machine. The budget is split per worker process:
+
+    cpu_budget       = available cores // SDLC_WORKERS
+    request_threads  = max(4, 2 * cpu_budget)      (SDLC_REQUEST_THREADS)
+    model_threads    = cpu_budget // request_threads, at least 1
+                                                    (SDLC_MODEL_THREADS)
+    blas_threads     = 1                            (SDLC_BLAS_THREADS)
+
+Single-row inference gains nothing from intra-op threads, so model and
+BLAS threads default to 1 and concurrency comes from the request pool.
+apply_native_thread_limits() must run before NumPy / xgboost are imported
+for the environment variables to take effect; backend.main does this first.
+"""
+
+import os
+
+_BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return max(1, int(raw)) if raw else default
+
+
+def get_thread_config() -> dict:
+    workers = _env_int("SDLC_WORKERS", 1)
+    cpu_budget = max(1, available_cores() // workers)
+    # Floor of 4 keeps probes and cheap routes responsive next to predictions.
+    request_threads = _env_int("SDLC_REQUEST_THREADS", max(4, 2 * cpu_budget))
+
+    return {
+        "cores": available_cores(),
+        "workers": workers,
+        "cpu_budget": cpu_budget,
+        "request_threads": request_threads,
+        "model_threads": _env_int("SDLC_MODEL_THREADS", max(1, cpu_budget // request_threads)),
+        "blas_threads": _env_int("SDLC_BLAS_THREADS", 1),
+    }
+
+
+def apply_native_thread_limits():
+    """
+    Cap OpenMP / BLAS pools. Explicit environment settings win.
+    """
+    blas_threads = str(get_thread_config()["blas_threads"])
+    for name in _BLAS_ENV_VARS:
+        os.environ.setdefault(name, blas_threads)
+
+    # Pools already started (e.g. NumPy imported first) are capped at runtime.
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(int(os.environ["OMP_NUM_THREADS"]))
+
+
+def configure_request_threadpool():
+    """
+    Size anyio's default thread limiter, which bounds concurrent sync
+    route handlers. Must be called from the event loop (e.g. startup).
+    """
+    from anyio import to_thread
+
+    to_thread.current_default_thread_limiter().total_tokens = get_thread_config()["request_threads"]
+
+
+def configure_model_threads(model):
+    """
+    Set xgboost's nthread on a loaded XGBClassifier.
+    """
+    n_threads = get_thread_config()["model_threads"]
+    model.set_params(n_jobs=n_threads)
+    model.get_booster().set_param("nthread", n_threads)
+    return model
@@ -0,0 +1,98 @@
+"""
+INPUT UNCERTAINTY - Monte Carlo robustness of a recommendation
+
+Slider and dropdown answers are estimates, so a single point prediction
+overstates certainty. This samples perturbed copies of a ProjectInput and
+scores them in one batched feature + predict_proba pass:
+
+- sliders (1–5) move −1 / 0 / +1 with probability 0.25 / 0.5 / 0.25
+- dropdowns (1 / 3 / 5) move one option down or up with probability 0.15 each
+- budget gets multiplicative log-normal noise (σ = 0.15)
+- duration gets relative normal noise (σ = 15%), rounded to whole months
+- team size and integration count are treated as known
+
+Results are recommendation frequencies and 5/50/95th percentile
+probabilities per class. Sampling is seeded from the input, so the same
+project always gets the same answer.
+"""
+
+import time
+import zlib
+
+import numpy as np
+
+from ml.counterfactual import SEARCH_SPACE, SLIDER_LEVELS
+from ml.feature_pipeline import RAW_INPUT_FIELDS
+from ml.model_loader import get_class_labels, get_feature_pipeline, load_model
+
+# ~20 ms per call on one core, within the tens-of-ms budget; frequencies
+# stay within ~0.02 of a 20,000-sample run.
+DEFAULT_SAMPLES = 2000
+
+SLIDER_STEP_PROBABILITIES = (0.25, 0.5, 0.25)
+DROPDOWN_STEP_PROBABILITY = 0.15
+BUDGET_LOG_SIGMA = 0.15
+DURATION_RELATIVE_SIGMA = 0.15
+
+INTERVAL_PERCENTILES = (5, 50, 95)
+
+
+def _sample_inputs(project, n: int, rng: np.random.Generator) -> dict:
+    columns = {
+        name: np.full(n, float(getattr(project, name)))
+        for name in RAW_INPUT_FIELDS
+    }
+
+    columns["project_budget"] *= rng.lognormal(0.0, BUDGET_LOG_SIGMA, n)
+    columns["project_duration_months"] = np.clip(
+        np.rint(columns["project_duration_months"] * rng.normal(1.0, DURATION_RELATIVE_SIGMA, n)), 1, 60
+    )
+
+    dropdown_steps = (
+        DROPDOWN_STEP_PROBABILITY,
+        1 - 2 * DROPDOWN_STEP_PROBABILITY,
+        DROPDOWN_STEP_PROBABILITY,
+    )
+    for name, levels in SEARCH_SPACE.items():
+        index = levels.index(getattr(project, name))
+        if levels == SLIDER_LEVELS:
+            steps = rng.choice((-1, 0, 1), size=n, p=SLIDER_STEP_PROBABILITIES)
+        else:
+            steps = rng.choice((-1, 0, 1), size=n, p=dropdown_steps)
+        columns[name] = np.asarray(levels, dtype=np.float64)[np.clip(index + steps, 0, len(levels) - 1)]
+
+    return columns
+
+
+def simulate_recommendations(project, n_samples: int = DEFAULT_SAMPLES, seed: int = None) -> dict:
+    start = time.perf_counter()
+
+    if seed is None:
+        seed = zlib.crc32(project.model_dump_json().encode())
+    rng = np.random.default_rng(seed)
+
+    model = load_model()
+    pipeline = get_feature_pipeline()
+    class_labels = get_class_labels()
+
+    probabilities = model.predict_proba(
+        pipeline.transform_batch(_sample_inputs(project, n_samples, rng))
+    )
+
+    frequencies = np.bincount(probabilities.argmax(axis=1), minlength=len(class_labels)) / n_samples
+    intervals = np.percentile(probabilities, INTERVAL_PERCENTILES, axis=0)
+
+    return {
+        "samples": n_samples,
+        "recommendation_frequency": {
+            label: round(float(frequencies[i]), 4) for i, label in enumerate(class_labels)
+        },
+        "probability_intervals": {
+            label: {
+                f"p{p}": round(float(intervals[k, i]), 4)
+                for k, p in enumerate(INTERVAL_PERCENTILES)
+            }
+            for i, label in enumerate(class_labels)
+        },
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
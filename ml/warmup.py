@@ -0,0 +1,151 @@
+"""
+STARTUP WARM-UP - Readiness gate for the inference paths
+
+Builds the SHAP explainer and pushes a few synthetic projects through the
+ML, SHAP and baseline paths before the instance reports ready, so the
+first real /predict does not pay for lazy initialisation. Results are kept
+in memory for the /healthz and /readyz probes.
+"""
+
+import logging
+import threading
+import time
+
+from backend.schemas.project_schema import ProjectInput
+from ml import predictor
+from ml.model_loader import load_encoder, load_metadata, load_model, validate_model_integrity
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ROUNDS = 3
+
+# Low / medium / high intensity profiles so different tree paths get touched.
+_SYNTHETIC_PROJECTS = [
+    dict(
+        project_budget=50_000, project_duration_months=3, team_size=3, number_of_integrations=0,
+        team_experience_level=1, agile_maturity_level=1, requirement_clarity=5,
+        client_involvement_level=1, regulatory_strictness=1, system_complexity=1,
+        automation_level=1, delivery_urgency=1, requirement_change_frequency=1,
+        decision_making_speed=1, domain_criticality=1, risk_tolerance_level=1,
+    ),
+    dict(
+        project_budget=500_000, project_duration_months=12, team_size=10, number_of_integrations=5,
+        team_experience_level=3, agile_maturity_level=3, requirement_clarity=3,
+        client_involvement_level=3, regulatory_strictness=3, system_complexity=3,
+        automation_level=3, delivery_urgency=3, requirement_change_frequency=3,
+        decision_making_speed=3, domain_criticality=3, risk_tolerance_level=3,
+    ),
+    dict(
+        project_budget=5_000_000, project_duration_months=36, team_size=40, number_of_integrations=20,
+        team_experience_level=5, agile_maturity_level=5, requirement_clarity=1,
+        client_involvement_level=5, regulatory_strictness=5, system_complexity=5,
+        automation_level=5, delivery_urgency=5, requirement_change_frequency=5,
+        decision_making_speed=5, domain_criticality=5, risk_tolerance_level=5,
+    ),
+]
+
+
+# =========================
+# WARM-UP STATE
+# =========================
+
+_STARTED_AT = time.time()
+
+_state = {
+    "ready": False,
+    "running": False,
+    "mode": None,
+    "model_version": None,
+    "timings_ms": {},
+    "errors": {},
+    "completed_at": None,
+}
+_state_lock = threading.Lock()
+
+
+def _timed(timings: dict, name: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    entry = timings.setdefault(name, {"calls": 0, "first": round(elapsed_ms, 2), "max": 0.0, "total": 0.0})
+    entry["calls"] += 1
+    entry["max"] = round(max(entry["max"], elapsed_ms), 2)
+    entry["total"] = round(entry["total"] + elapsed_ms, 2)
+    return result
+
+
+def run_warmup(rounds: int = WARMUP_ROUNDS) -> dict:
+    """
+    Warm every inference path and mark the instance ready.
+
+    Failures on the ML or SHAP path are recorded but do not block
+    readiness: the predictor serves the baseline in that case.
+    """
+    timings = {}
+    errors = {}
+    model_version = None
+    projects = [ProjectInput(**values) for values in _SYNTHETIC_PROJECTS]
+
+    with _state_lock:
+        _state["running"] = True
+
+    try:
+        _timed(timings, "load_model", load_model)
+        _timed(timings, "validate_integrity", validate_model_integrity)
+        load_encoder()
+        model_version = load_metadata().get("model_version")
+    except Exception as error:
+        errors["ml"] = str(error)
+
+    if "ml" not in errors:
+        try:
+            _timed(timings, "shap_explainer_build", predictor._get_shap_explainer)
+        except Exception as error:
+            errors["shap"] = str(error)
+
+        try:
+            for _ in range(rounds):
+                for project in projects:
+                    _timed(timings, "ml_predict", lambda: predictor._build_ml_result(project))
+        except Exception as error:
+            errors["ml"] = str(error)
+
+    for _ in range(rounds):
+        for project in projects:
+            _timed(timings, "baseline_predict", lambda: predictor._build_baseline_result(project))
+
+    for entry in timings.values():
+        entry["mean"] = round(entry.pop("total") / entry["calls"], 2)
+
+    with _state_lock:
+        _state.update(
+            ready=True,
+            running=False,
+            mode="ML_PRIMARY_WITH_FALLBACK" if "ml" not in errors else "BASELINE_ONLY",
+            model_version=model_version,
+            timings_ms=timings,
+            errors=errors,
+            completed_at=time.time(),
+        )
+
+    logger.info("Warm-up complete: mode=%s timings=%s", _state["mode"], timings)
+    return get_warmup_state()
+
+
+def start_warmup_in_background() -> threading.Thread:
+    thread = threading.Thread(target=run_warmup, name="sdlc-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_warmup_state() -> dict:
+    with _state_lock:
+        state = dict(_state)
+
+    state["uptime_s"] = round(time.time() - _STARTED_AT, 2)
+    return state
+
+
+def is_ready() -> bool:
+    return _state["ready"]
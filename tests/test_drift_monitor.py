@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from ml.drift_monitor import DriftMonitor, build_drift_reference
+
+
+def _monitor(min_samples: int) -> DriftMonitor:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=1000), "b": rng.uniform(size=1000)})
+    y = pd.Series(rng.choice(["Agile", "Waterfall"], size=1000))
+    return DriftMonitor(build_drift_reference(X, y, "test"), min_samples=min_samples)
+
+
+def test_below_min_samples_reports_insufficient_data_without_flags():
+    monitor = _monitor(min_samples=100)
+    monitor.update({"a": 0.0, "b": 0.5}, "Agile")
+
+    report = monitor.report()
+    assert report["status"] == "insufficient_data"
+    assert report["sample_count"] == 1
+    assert report["drifted_features"] == []
+    assert report["features"] == {}
+    assert "max_feature_psi" not in report
+
+
+def test_at_min_samples_scores_drift():
+    monitor = _monitor(min_samples=100)
+    rng = np.random.default_rng(1)
+    for a, b in zip(rng.normal(size=500), rng.uniform(size=500)):
+        monitor.update({"a": a, "b": b}, "Agile")
+
+    report = monitor.report()
+    assert report["status"] == "ok"
+    assert report["drifted_features"] == []
+    assert report["features"]["a"]["status"] == "stable"
+
+
+def test_shifted_traffic_is_flagged_once_enough_samples():
+    monitor = _monitor(min_samples=100)
+    rng = np.random.default_rng(2)
+    for a, b in zip(rng.normal(loc=3.0, size=200), rng.uniform(size=200)):
+        monitor.update({"a": a, "b": b}, "Agile")
+
+    assert monitor.report()["drifted_features"] == ["a"]
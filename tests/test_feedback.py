@@ -0,0 +1,40 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from backend.routes.feedback import FeedbackInput, _parse_bulk
+
+
+def test_blank_actual_sdlc_used_is_not_reported():
+    assert FeedbackInput(project_id="p", actual_sdlc_used="").actual_sdlc_used is None
+    assert FeedbackInput(project_id="p", actual_sdlc_used="  ").actual_sdlc_used is None
+    assert FeedbackInput(project_id="p").actual_sdlc_used is None
+
+
+def test_known_actual_sdlc_used_is_kept():
+    assert FeedbackInput(project_id="p", actual_sdlc_used="Hybrid").actual_sdlc_used == "Hybrid"
+
+
+def test_unknown_actual_sdlc_used_is_rejected():
+    with pytest.raises(ValidationError, match="must be one of"):
+        FeedbackInput(project_id="p", actual_sdlc_used="Scrum")
+
+
+def test_csv_row_with_blank_label_validates():
+    [(raw, error)] = _parse_bulk(b"project_id,actual_sdlc_used,notes\np1,,late\n", "text/csv")
+    assert error is None
+    assert FeedbackInput.model_validate(raw).actual_sdlc_used is None
+
+
+def test_ndjson_row_with_blank_label_validates():
+    [(raw, error)] = _parse_bulk(b'{"project_id": "p1", "actual_sdlc_used": ""}\n', "application/x-ndjson")
+    assert error is None
+    assert FeedbackInput.model_validate(raw).actual_sdlc_used is None
+
+
+def test_non_utf8_bulk_body_is_a_client_error():
+    body = "project_id,notes\np1,café\n".encode("cp1252")
+    with pytest.raises(HTTPException) as raised:
+        _parse_bulk(body, "text/csv")
+    assert raised.value.status_code == 400
+    assert "UTF-8" in raised.value.detail